@@ -1,35 +1,447 @@
 import os
 import re
-from typing import List, Tuple, Dict, Any
-from flask import Flask, render_template, request, send_from_directory, jsonify
+import json
+import base64
+import time
+import atexit
+import pickle
+import bisect
+import hashlib
+import functools
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Tuple, Dict, Any, Optional
+import numpy as np
+from flask import Flask, Response, g, render_template, request, send_from_directory, jsonify
 import chromadb
-from sentence_transformers import SentenceTransformer
 
-# Paths
+from bm25 import BM25Index, reciprocal_rank_fusion
+from features import (
+    EDUCATION_KEYWORDS,
+    FEATURES_VERSION,
+    STOPWORDS,
+    extract_features,
+    score_education,
+    score_skills_and_experience,
+)
+from embedders import MicroBatcher, TorchEmbedder, load_embedder
+from metrics import StageMetrics, server_timing_header
+from vector_store import NumpyStore, make_vector_store
+
+try:
+    import ahocorasick
+except ImportError:  # optional; KeywordMatcher falls back to substring search
+    ahocorasick = None
+
+# Paths; each folder can be pointed elsewhere (e.g. a benchmark corpus) through the environment
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CLEANED_FOLDER = os.path.join(BASE_DIR, "cleaned_resumes")
-INTERVIEW_FOLDER = os.path.join(BASE_DIR, "interview_notes")
-ORIGINAL_RESUMES_FOLDER = os.path.join(BASE_DIR, "resumes")
-CHROMA_PATH = os.path.join(BASE_DIR, "resume_db")
-
-# Embedding model and DB
-model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
-collection = chroma_client.get_or_create_collection("resumes")
+CLEANED_FOLDER = os.environ.get("CLEANED_FOLDER") or os.path.join(BASE_DIR, "cleaned_resumes")
+INTERVIEW_FOLDER = os.environ.get("INTERVIEW_FOLDER") or os.path.join(BASE_DIR, "interview_notes")
+ORIGINAL_RESUMES_FOLDER = os.environ.get("ORIGINAL_RESUMES_FOLDER") or os.path.join(BASE_DIR, "resumes")
+CHROMA_PATH = os.environ.get("CHROMA_PATH") or os.path.join(BASE_DIR, "resume_db")
+MANIFEST_PATH = os.path.join(CHROMA_PATH, "index_manifest.json")
+BM25_PATH = os.path.join(CHROMA_PATH, "bm25_index.pkl")
+INDEX_VERSION_PATH = os.path.join(CHROMA_PATH, "index_version.json")
+NUMPY_STORE_PATH = os.path.join(CHROMA_PATH, "numpy_store")
+
+# Bulk indexing
+INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE", "64"))
+INDEX_WORKERS = int(os.environ.get("INDEX_WORKERS", "1"))
+CHROMA_WRITE_BATCH = int(os.environ.get("CHROMA_WRITE_BATCH", "1000"))
+
+# Embedding backend: torch (reference), onnx or int8
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", "torch")
+EMBED_MIN_AGREEMENT = float(os.environ.get("EMBED_MIN_AGREEMENT", "0.99"))
+EMBED_VALIDATE = os.environ.get("EMBED_VALIDATE", "1") != "0"
+
+# Batch JD ranking
+JD_BATCH_MAX = int(os.environ.get("JD_BATCH_MAX", "100"))
+
+# Vector store used for queries: chroma, or numpy (memory-mapped float16 exact search)
+VECTOR_STORE = os.environ.get("VECTOR_STORE", "chroma")
+
+# Query micro-batching; EMBED_MAX_BATCH=1 encodes every query on its own thread
+EMBED_BATCH_WINDOW_MS = float(os.environ.get("EMBED_BATCH_WINDOW_MS", "2"))
+EMBED_MAX_BATCH = int(os.environ.get("EMBED_MAX_BATCH", "32"))
+
+# Query embedding cache
+EMBED_CACHE_MAX_ENTRIES = int(os.environ.get("EMBED_CACHE_MAX_ENTRIES", "4096"))
+EMBED_CACHE_MAX_MB = float(os.environ.get("EMBED_CACHE_MAX_MB", "32"))
+EMBED_CACHE_PATH = os.environ.get("EMBED_CACHE_PATH") or None
+
+# Search result cache; TTL 0 keeps entries until the index version changes
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024"))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "0"))
+
+# Pagination: candidates ranked per query, page size cap, and how long a
+# ranked list is kept for fetching later pages
+SEARCH_DEPTH = int(os.environ.get("SEARCH_DEPTH", "50"))
+SEARCH_MAX_LIMIT = int(os.environ.get("SEARCH_MAX_LIMIT", "50"))
+RANKED_CACHE_TTL = float(os.environ.get("RANKED_CACHE_TTL", "300"))
+
+# Fraction of search requests timed per stage (Server-Timing header and /metrics)
+TIMING_SAMPLE_RATE = float(os.environ.get("TIMING_SAMPLE_RATE", "1.0"))
+
+# Hybrid retrieval
+HYBRID_POOL = int(os.environ.get("HYBRID_POOL", "20"))
+RRF_K = int(os.environ.get("RRF_K", "60"))
+
+# Embedding model and DB, loaded in the background by warm_up()
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+model = None
+query_batcher = None
+query_cache = None
+chroma_client = None
+collection = None
+keyword_index = None
+vector_store = None
+# Exact matrix scoring for /api/search/jd/batch whatever VECTOR_STORE is; see batch_vector_store()
+_batch_store = None
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
+stage_metrics = StageMetrics(TIMING_SAMPLE_RATE)
 
 # Enable CORS for React Native app
 from flask_cors import CORS
 CORS(app)
 
 
+# --- Warm-up ---
+_ready = threading.Event()
+_warmup: Dict[str, Any] = {
+    "stage": "starting",
+    "started_at": time.time(),
+    "ready_at": None,
+    "progress": None,
+    "embedding_backend": None,
+    "sync": None,
+    "error": None,
+}
+
+
+def warmup_status() -> Dict[str, Any]:
+    status = dict(_warmup)
+    status["ready"] = _ready.is_set()
+    status["elapsed"] = round((status["ready_at"] or time.time()) - status["started_at"], 2)
+    return status
+
+
+def _probe_texts(limit: int = 16) -> Optional[List[str]]:
+    """A few corpus documents to validate a non-reference embedding backend on."""
+    texts = []
+    for info in list(scan_documents().values())[:limit]:
+        try:
+            text, _ = read_document(info["path"])
+        except (OSError, UnicodeDecodeError):
+            continue
+        if text:
+            texts.append(text)
+    return texts or None
+
+
+def warm_up() -> None:
+    """Load the model, open the index and sync it, then mark the app ready."""
+    global model, query_batcher, query_cache, chroma_client, collection, keyword_index, vector_store
+    try:
+        _warmup["stage"] = "loading_model"
+        model, agreement = load_embedder(
+            EMBED_BACKEND, MODEL_NAME, EMBED_MIN_AGREEMENT, EMBED_VALIDATE, probe_texts=_probe_texts()
+        )
+        _warmup["embedding_backend"] = {"name": model.name, "agreement": agreement}
+        if EMBED_MAX_BATCH > 1:
+            query_batcher = MicroBatcher(model.encode, EMBED_BATCH_WINDOW_MS, EMBED_MAX_BATCH)
+        query_cache = EmbeddingCache(
+            model.model_id, EMBED_CACHE_MAX_ENTRIES, int(EMBED_CACHE_MAX_MB * 1024 * 1024), EMBED_CACHE_PATH
+        )
+        atexit.register(query_cache.save)
+        _warmup["stage"] = "opening_index"
+        chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
+        collection = chroma_client.get_or_create_collection("resumes")
+        keyword_index = BM25Index(BM25_PATH)
+        vector_store = make_vector_store(VECTOR_STORE, collection, NUMPY_STORE_PATH)
+        _warmup["stage"] = "syncing_index"
+        _warmup["sync"] = sync_index()
+        _warmup["stage"] = "ready"
+        _warmup["ready_at"] = time.time()
+        _ready.set()
+        print(f"Warm-up finished in {warmup_status()['elapsed']}s")
+    except Exception as e:
+        _warmup["stage"] = "failed"
+        _warmup["error"] = str(e)
+        print(f"Warm-up failed: {e}")
+
+
+def require_ready(view):
+    """Answer 503 with warm-up progress until the model and index are ready."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _ready.is_set():
+            body = {
+                "results": [],
+                "message": "⏳ Search is warming up, please retry shortly.",
+                "warmup": warmup_status(),
+            }
+            return jsonify(body), 503, {"Retry-After": "5"}
+        return view(*args, **kwargs)
+    return wrapper
+
+
 def embed_text(text: str) -> List[float]:
-    return model.encode([text], normalize_embeddings=True)[0].tolist()
+    return model.encode([text])[0].tolist()
+
+
+class EmbeddingCache:
+    """Bounded LRU of query embeddings keyed on (model id, normalized text).
+
+    Entries are evicted once either the entry count or the approximate memory
+    footprint is exceeded. If ``path`` is set the cache is loaded from and
+    saved to that file so warm entries survive restarts.
+    """
+
+    def __init__(self, model_id: str, max_entries: int, max_bytes: int, path: Optional[str] = None):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # The MiniLM tokenizer is uncased and ignores runs of whitespace
+        return " ".join(text.lower().split())
+
+    @staticmethod
+    def _entry_size(key: Tuple[str, str], emb: np.ndarray) -> int:
+        return emb.nbytes + len(key[0]) + len(key[1]) + 64
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = (self.model_id, self.normalize(text))
+        with self._lock:
+            emb = self._entries.get(key)
+            if emb is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return emb.tolist()
+
+    def put(self, text: str, emb: List[float]) -> None:
+        key = (self.model_id, self.normalize(text))
+        arr = np.asarray(emb, dtype=np.float32)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old)
+            self._entries[key] = arr
+            self._bytes += self._entry_size(key, arr)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                old_key, old_emb = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old_key, old_emb)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                items = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        for (model_id, text), emb in items:
+            if model_id == self.model_id:
+                self.put(text, emb)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            items = list(self._entries.items())
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(items, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+
+
+class ResultCache:
+    """LRU of search responses, tagged with the index version they were computed at.
+
+    Entries from an older index version are treated as misses. Concurrent
+    requests for the same key share one computation (singleflight): the
+    first caller computes, the others wait for its result.
+    """
+
+    def __init__(self, max_entries: int, ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+        self._entries: "OrderedDict[Tuple, Tuple[int, Any, float, float]]" = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Tuple, version: int, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, value, cost, stored_at = entry
+                if entry_version == version and (not self.ttl or time.monotonic() - stored_at < self.ttl):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.saved_seconds += cost
+                    return value
+                del self._entries[key]
+            flight_key = (key, version)
+            future = self._inflight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[flight_key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            value = compute()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(flight_key, None)
+            future.set_exception(e)
+            raise
+        cost = time.perf_counter() - start
+        with self._lock:
+            self._inflight.pop(flight_key, None)
+            self._entries[key] = (version, value, cost, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+result_cache = ResultCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL)
+ranked_cache = ResultCache(RESULT_CACHE_MAX_ENTRIES, RANKED_CACHE_TTL)
+
+PAGE_FIELDS = ("limit", "cursor")
+
+
+def cached_search(endpoint: str, fields: Tuple[str, ...]):
+    """Serve a search view from ``result_cache``, keyed on its whitespace-normalized form fields.
+
+    The key without the paging fields is left in ``g.search_key`` for
+    ranked_results(). The view must return a JSON-serializable dict.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper():
+            g.search_key = (endpoint,) + tuple(" ".join(str(request.form.get(f, "")).split()) for f in fields)
+            page = tuple(request.form.get(f, "").strip() for f in PAGE_FIELDS)
+            return result_cache.get_or_compute(g.search_key + page, index_version(), view)
+        return wrapper
+    return decorator
+
+
+def ranked_results(compute):
+    """Full ranked candidate list for the current search, shared by all its pages."""
+    return ranked_cache.get_or_compute(g.search_key, index_version(), compute)
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Offset stored in a cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        offset = int(json.loads(raw)["offset"])
+    except (TypeError, KeyError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
 
 
-def load_documents() -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
-    docs, ids, metadatas = [], [], []
+def parse_page(form) -> Tuple[int, int]:
+    """``(offset, limit)`` from the ``cursor`` and ``limit`` fields; raises ValueError on a bad cursor."""
+    try:
+        limit = int(form.get("limit", 5))
+    except (TypeError, ValueError):
+        limit = 5
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    cursor = (form.get("cursor") or "").strip()
+    return (decode_cursor(cursor) if cursor else 0), limit
+
+
+def page_of(ranked: list, offset: int, limit: int) -> Tuple[list, Optional[str]]:
+    """Slice one page out of a ranked list, with the cursor of the next page (None on the last)."""
+    end = offset + limit
+    return ranked[offset:end], (encode_cursor(end) if end < len(ranked) else None)
+
+
+def embed_query(text: str) -> List[float]:
+    """Embed a search query, reusing cached embeddings for repeated queries.
+
+    Cache misses go through the micro-batcher so concurrent queries share a
+    single model call.
+    """
+    with stage_metrics.stage("embed"):
+        emb = query_cache.get(text)
+        if emb is None:
+            emb = query_batcher.encode(text).tolist() if query_batcher is not None else embed_text(text)
+            query_cache.put(text, emb)
+    return emb
+
+
+def embed_queries(texts: List[str]) -> np.ndarray:
+    """Embed many queries with a single model call for the cache misses."""
+    with stage_metrics.stage("embed"):
+        embs: List[Optional[List[float]]] = [query_cache.get(text) for text in texts]
+        misses = [i for i, emb in enumerate(embs) if emb is None]
+        if misses:
+            fresh = model.encode([texts[i] for i in misses], batch_size=INDEX_BATCH_SIZE)
+            for i, emb in zip(misses, fresh):
+                embs[i] = emb.tolist()
+                query_cache.put(texts[i], embs[i])
+    return np.asarray(embs, dtype=np.float32)
+
+
+def scan_documents() -> Dict[str, Dict[str, Any]]:
+    """Stat every source document without reading it."""
+    found = {}
     for folder in [CLEANED_FOLDER, INTERVIEW_FOLDER]:
         if not os.path.exists(folder):
             continue
@@ -37,75 +449,485 @@ def load_documents() -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
         for fname in os.listdir(folder):
             fpath = os.path.join(folder, fname)
             if os.path.isfile(fpath):
-                with open(fpath, "r", encoding="utf-8") as f:
-                    text = f.read().strip()
-                if text:
-                    docs.append(text)
-                    ids.append(fname)
-                    metadatas.append({"type": doc_type, "filename": fname})
-    return docs, ids, metadatas
-
-
-def index_if_needed():
-    existing = collection.get()
-    if len(existing.get("ids", [])) == 0:
-        docs, ids, metadatas = load_documents()
-        for i, doc in enumerate(docs):
-            emb = embed_text(doc)
-            collection.add(
-                documents=[doc], embeddings=[emb], ids=[ids[i]], metadatas=[metadatas[i]]
-            )
+                st = os.stat(fpath)
+                found[fname] = {"path": fpath, "type": doc_type, "mtime": st.st_mtime, "size": st.st_size}
+    return found
 
 
-def search_profiles(query: str, top_k: int = 5, include_notes: bool = True):
-    query_emb = embed_text(query)
-    where = None if include_notes else {"type": "resume"}
-    results = collection.query(query_embeddings=[query_emb], n_results=top_k, where=where)
-    return list(
-        zip(
-            results.get("ids", [["-"]])[0],
-            results.get("documents", [[""]])[0],
-            results.get("distances", [[0.0]])[0],
-            results.get("metadatas", [[{}]])[0],
-        )
+def read_document(fpath: str) -> Tuple[str, str]:
+    """Return the stripped text of a document and the sha256 of its bytes."""
+    with open(fpath, "rb") as f:
+        raw = f.read()
+    text = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    return text.strip(), hashlib.sha256(raw).hexdigest()
+
+
+def load_manifest() -> Dict[str, Dict[str, Any]]:
+    if not os.path.isfile(MANIFEST_PATH):
+        return {}
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _normalize_rows(embs: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embs, axis=1, keepdims=True)
+    return embs / np.clip(norms, 1e-12, None)
+
+
+def embed_texts(texts: List[str], batch_size: int = INDEX_BATCH_SIZE, pool=None) -> List[List[float]]:
+    """Embed many documents at once, optionally through a multi-process pool."""
+    if pool is not None:
+        embs = model.model.encode_multi_process(texts, pool, batch_size=batch_size)
+        return _normalize_rows(embs).tolist()
+    return model.encode(texts, batch_size=batch_size).tolist()
+
+
+def bulk_index(
+    docs: List[str],
+    ids: List[str],
+    metadatas: List[Dict[str, Any]],
+    batch_size: int = INDEX_BATCH_SIZE,
+    workers: int = INDEX_WORKERS,
+    write_batch: int = CHROMA_WRITE_BATCH,
+) -> Dict[str, Any]:
+    """Embed documents in batches and write them to Chroma in large chunks.
+
+    Documents are processed one write chunk at a time so memory stays bounded
+    on large corpora. With ``workers > 1`` encoding is spread over a
+    sentence-transformers process pool (PyTorch backend only).
+    """
+    write_batch = max(1, min(write_batch, getattr(chroma_client, "max_batch_size", write_batch)))
+    start = time.perf_counter()
+    _warmup["progress"] = {"done": 0, "total": len(docs)}
+    pool = None
+    if workers > 1 and len(docs) > batch_size and model.name == TorchEmbedder.name:
+        pool = model.model.start_multi_process_pool(target_devices=["cpu"] * workers)
+    try:
+        for i in range(0, len(docs), write_batch):
+            chunk = slice(i, i + write_batch)
+            embeddings = embed_texts(docs[chunk], batch_size=batch_size, pool=pool)
+            collection.upsert(
+                documents=docs[chunk], embeddings=embeddings, ids=ids[chunk], metadatas=metadatas[chunk]
+            )
+            _warmup["progress"] = {"done": min(i + write_batch, len(docs)), "total": len(docs)}
+    finally:
+        if pool is not None:
+            model.model.stop_multi_process_pool(pool)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "documents": len(docs),
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(len(docs) / elapsed, 2) if elapsed > 0 else 0.0,
+        "batch_size": batch_size,
+        "workers": workers,
+    }
+    print(
+        f"Indexed {stats['documents']} documents in {stats['seconds']}s "
+        f"({stats['docs_per_sec']} docs/sec, batch_size={batch_size}, workers={workers})"
     )
+    return stats
 
 
-SKILL_PATTERN = re.compile(r"\b([A-Za-z][A-Za-z+#\.\-]+)\b")
-YEARS_PATTERN = re.compile(r"(\d+)\s*(?:\+?\s*)?(?:years|yrs|year)\b", re.IGNORECASE)
+_sync_lock = threading.Lock()
+_index_version = None
+_index_version_mtime = None
+# Index version this process's keyword index and vector store reflect
+_loaded_index_version = None
 
 
-def score_skills_and_experience(text: str, required_skills: List[str], min_years: int) -> float:
-    text_lower = text.lower()
-    score = 0.0
-    for skill in required_skills:
-        if skill.lower() in text_lower:
-            score += 1.0
-    years = 0
-    for m in YEARS_PATTERN.finditer(text_lower):
+def index_version() -> int:
+    """Persisted counter, incremented whenever a sync adds, changes or deletes documents.
+
+    The file is re-read whenever its mtime changes, so a sync run by another
+    worker process is seen here too (one stat() per call otherwise).
+    """
+    global _index_version, _index_version_mtime
+    try:
+        mtime = os.stat(INDEX_VERSION_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    if _index_version is None or mtime != _index_version_mtime:
         try:
-            years = max(years, int(m.group(1)))
-        except ValueError:
-            continue
-    if years >= min_years:
-        score += 0.5
-    return score
-
-
-def score_education(text: str, levels: List[str]) -> float:
-    text_lower = text.lower()
-    score = 0.0
-    keywords = {
-        "phd": ["phd", "doctor of philosophy"],
-        "masters": ["masters", "m.s.", "ms ", "m.tech", "mtech", "m.sc", "msc"],
-        "bachelors": ["bachelors", "b.e.", "btech", "b.tech", "b.sc", "bsc", "bca", "b.eng"],
+            with open(INDEX_VERSION_PATH, "r", encoding="utf-8") as f:
+                _index_version = int(json.load(f)["version"])
+        except (OSError, ValueError, KeyError):
+            _index_version = 0
+        _index_version_mtime = mtime
+    return _index_version
+
+
+def follow_index_version() -> None:
+    """Reload the keyword index and vector store after another process synced."""
+    global _loaded_index_version
+    version = index_version()
+    if version == _loaded_index_version:
+        return
+    with _sync_lock:
+        if version == _loaded_index_version:
+            return
+        keyword_index.load()
+        _refresh_vector_stores(version)
+        _loaded_index_version = version
+
+
+def _refresh_vector_stores(version: int) -> None:
+    vector_store.refresh(version)
+    if _batch_store is not None and _batch_store is not vector_store:
+        _batch_store.refresh(version)
+
+
+def batch_vector_store() -> NumpyStore:
+    """NumPy store for batch scoring: the query store itself when it is one,
+    otherwise a matrix exported from the collection on first use and kept
+    current by every later sync."""
+    global _batch_store
+    if _batch_store is None:
+        with _sync_lock:
+            if _batch_store is None:
+                if isinstance(vector_store, NumpyStore):
+                    store = vector_store
+                else:
+                    store = NumpyStore(NUMPY_STORE_PATH, collection)
+                    store.refresh(index_version())
+                _batch_store = store
+    return _batch_store
+
+
+def _bump_index_version() -> None:
+    global _index_version
+    _index_version = index_version() + 1
+    tmp_path = INDEX_VERSION_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": _index_version}, f)
+    os.replace(tmp_path, INDEX_VERSION_PATH)
+
+
+def sync_index() -> Dict[str, Any]:
+    """Bring the collection in line with the files on disk.
+
+    The manifest records a content hash and mtime per document id. Files whose
+    mtime and size are unchanged are skipped without being read; files whose
+    bytes hash the same are only re-stamped. Everything else is re-embedded,
+    and ids whose files are gone are deleted from the collection. The BM25
+    keyword index is updated alongside.
+    """
+    global _loaded_index_version
+    start = time.perf_counter()
+    with _sync_lock:
+        manifest = load_manifest()
+        current = scan_documents()
+        indexed_ids = set(collection.get(include=[]).get("ids", []))
+
+        docs, ids, metadatas = [], [], []
+        outdated = []
+        emptied = 0
+        unchanged = 0
+        for doc_id, info in current.items():
+            entry = manifest.get(doc_id)
+            # An entry is only trusted if the collection agrees with it
+            consistent = doc_id in indexed_ids or (entry is not None and not entry.get("indexed", True))
+            if (
+                entry
+                and consistent
+                and entry["type"] == info["type"]
+                and entry["mtime"] == info["mtime"]
+                and entry["size"] == info["size"]
+            ):
+                unchanged += 1
+                if entry.get("indexed", True) and entry.get("features") != FEATURES_VERSION:
+                    outdated.append(doc_id)
+                continue
+            text, digest = read_document(info["path"])
+            record = {"sha256": digest, "mtime": info["mtime"], "size": info["size"], "type": info["type"]}
+            if entry and consistent and entry["sha256"] == digest and entry["type"] == info["type"]:
+                manifest[doc_id] = dict(entry, **record)
+                unchanged += 1
+                if entry.get("indexed", True) and entry.get("features") != FEATURES_VERSION:
+                    outdated.append(doc_id)
+                continue
+            record["indexed"] = bool(text)
+            record["features"] = FEATURES_VERSION
+            manifest[doc_id] = record
+            if text:
+                docs.append(text)
+                ids.append(doc_id)
+                metadatas.append({"type": info["type"], "filename": doc_id, **extract_features(text)})
+            elif doc_id in indexed_ids:
+                collection.delete(ids=[doc_id])
+                emptied += 1
+
+        removed = sorted((indexed_ids | set(manifest)) - set(current))
+        stale = [doc_id for doc_id in removed if doc_id in indexed_ids]
+        if stale:
+            collection.delete(ids=stale)
+        for doc_id in removed:
+            manifest.pop(doc_id, None)
+
+        if docs:
+            bulk_index(docs, ids, metadatas)
+        refresh_features(outdated, current, manifest)
+        save_manifest(manifest)
+        sync_keyword_index(manifest, current, dict(zip(ids, docs)))
+        if docs or stale or outdated or emptied:
+            _bump_index_version()
+        _refresh_vector_stores(index_version())
+        _loaded_index_version = index_version()
+
+    stats = {
+        "indexed": len(docs),
+        "deleted": len(stale) + emptied,
+        "unchanged": unchanged,
+        "features_refreshed": len(outdated),
+        "seconds": round(time.perf_counter() - start, 3),
     }
-    for level in levels:
-        for kw in keywords.get(level.lower(), []):
-            if kw in text_lower:
-                score += 1.0
-                break
-    return score
+    print(f"Index sync: {stats['indexed']} indexed, {stats['deleted']} deleted, {stats['unchanged']} unchanged")
+    return stats
+
+
+def refresh_features(
+    doc_ids: List[str], current: Dict[str, Dict[str, Any]], manifest: Dict[str, Dict[str, Any]]
+) -> None:
+    """Rewrite the metadata of documents indexed with an older FEATURES_VERSION, without re-embedding."""
+    for i in range(0, len(doc_ids), CHROMA_WRITE_BATCH):
+        chunk = doc_ids[i:i + CHROMA_WRITE_BATCH]
+        metadatas = []
+        for doc_id in chunk:
+            text, _ = read_document(current[doc_id]["path"])
+            metadatas.append({"type": current[doc_id]["type"], "filename": doc_id, **extract_features(text)})
+        collection.update(ids=chunk, metadatas=metadatas)
+        for doc_id in chunk:
+            manifest[doc_id]["features"] = FEATURES_VERSION
+
+
+def sync_keyword_index(
+    manifest: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]], fresh: Dict[str, str]
+) -> None:
+    """Apply freshly indexed texts to the BM25 index and reconcile it with the manifest."""
+    expected = {doc_id for doc_id, entry in manifest.items() if entry.get("indexed", True)}
+    present = set(keyword_index.ids())
+    changed = bool(fresh)
+    for doc_id, text in fresh.items():
+        keyword_index.add(doc_id, text, current[doc_id]["type"])
+    for doc_id in present - expected:
+        keyword_index.remove(doc_id)
+        changed = True
+    for doc_id in expected - present - set(fresh):
+        text, _ = read_document(current[doc_id]["path"])
+        keyword_index.add(doc_id, text, current[doc_id]["type"])
+        changed = True
+    if changed:
+        keyword_index.save()
+
+
+def search_profiles(query: str, top_k: int = 5, include_notes: bool = True, filters: Optional[Dict[str, Any]] = None):
+    query_emb = np.asarray(embed_query(query), dtype=np.float32)
+    return semantic_rows(query_emb, top_k, build_where(include_notes, **(filters or {})))
+
+
+def semantic_rows(query_emb: np.ndarray, top_k: int, where: Optional[Dict[str, Any]]):
+    """Vector-store hits for one query embedding, as rows without documents."""
+    # Document bodies are left out of the query; see with_documents()
+    with stage_metrics.stage("vector_query"):
+        hits = vector_store.query(query_emb[None, :], top_k, where)[0]
+    return [(rid, None, dist, meta) for rid, dist, meta in hits]
+
+
+def with_documents(rows):
+    """Fill in the full text of result rows that were fetched without it."""
+    need = [row[0] for row in rows if row[1] is None]
+    texts: Dict[str, str] = {}
+    if need:
+        with stage_metrics.stage("fetch_documents"):
+            got = collection.get(ids=need, include=["documents"])
+        texts = dict(zip(got["ids"], got["documents"]))
+    return [
+        (rid, doc if doc is not None else texts.get(rid, ""), dist, meta)
+        for rid, doc, dist, meta in rows
+    ]
+
+
+def preview_words(doc: Optional[str], meta: Optional[Dict[str, Any]], n: int) -> str:
+    """First ``n`` words of a document, from its stored snippet when available."""
+    snippet = (meta or {}).get("snippet")
+    if snippet is None:
+        snippet = doc or ""
+    return " ".join(snippet.split()[:n])
+
+
+def hybrid_search(
+    query: str,
+    keyword_query: str,
+    top_k: int = 10,
+    include_notes: bool = True,
+    filters: Optional[Dict[str, Any]] = None,
+):
+    """Fuse vector and BM25 candidates with reciprocal-rank fusion."""
+    pool = max(top_k, HYBRID_POOL)
+    # Embedded once; the same vector scores the keyword-only hits
+    query_emb = np.asarray(embed_query(query), dtype=np.float32)
+    where = build_where(include_notes, **(filters or {}))
+    semantic = semantic_rows(query_emb, pool, where)
+    return fuse_keyword_hits(semantic, query_emb, keyword_query, pool, top_k, where, include_notes)
+
+
+def fuse_keyword_hits(
+    semantic,
+    query_emb: np.ndarray,
+    keyword_query: str,
+    pool: int,
+    top_k: int,
+    where: Optional[Dict[str, Any]],
+    include_notes: bool,
+    store=None,
+):
+    """Fuse semantic rows with the BM25 hits for ``keyword_query``.
+
+    BM25 returns ``pool`` candidates; keyword-only hits are looked up in the
+    vector store (which also applies ``where`` to them) and given the same
+    squared-L2 distance the store reports.
+    """
+    with stage_metrics.stage("bm25"):
+        lexical = keyword_index.search(keyword_query, top_k=pool, doc_type=None if include_notes else "resume")
+    by_id = {row[0]: row for row in semantic}
+
+    missing = [doc_id for doc_id, _ in lexical if doc_id not in by_id]
+    if missing:
+        with stage_metrics.stage("vector_query"):
+            keyword_only = (store or vector_store).get(missing, where)
+        for rid, emb, meta in keyword_only:
+            dist = float(np.sum((query_emb - emb) ** 2))
+            by_id[rid] = (rid, None, dist, meta)
+
+    rankings = [[row[0] for row in semantic], [doc_id for doc_id, _ in lexical if doc_id in by_id]]
+    fused = reciprocal_rank_fusion(rankings, k=RRF_K)[:top_k]
+    return [by_id[doc_id] for doc_id in fused]
+
+
+def rank_jds(jds: List[str], top_k: int, filters: Optional[Dict[str, Any]] = None):
+    """Rank the corpus against many JDs at once.
+
+    All JDs are embedded in one call and scored against the corpus matrix
+    in one vectorized step (batch_vector_store(), a NumPy store even when
+    single queries go to Chroma). Each JD's semantic
+    hits are fused with its BM25 hits like hybrid_search(), then
+    keyword-rescored like the single JD endpoint. Returns
+    ``(payload, any_keywords_found)`` per JD.
+    """
+    where = build_where(False, **(filters or {}))
+    pool = max(2 * top_k, HYBRID_POOL)
+    embs = embed_queries(jds)
+    store = batch_vector_store()
+    with stage_metrics.stage("vector_query"):
+        hits = store.query(embs, pool, where)
+
+    candidates, terms_per_jd = [], []
+    for jd, query_emb, jd_hits in zip(jds, embs, hits):
+        terms = jd_terms(jd)
+        semantic = [(rid, None, dist, meta) for rid, dist, meta in jd_hits]
+        candidates.append(fuse_keyword_hits(semantic, query_emb, " ".join(terms), pool, 2 * top_k, where, False, store))
+        terms_per_jd.append(terms)
+
+    # Load the text of every candidate across the batch in one round trip
+    unique_rows = {r[0]: r for rows in candidates for r in rows}
+    texts = {rid: doc for rid, doc, _, _ in with_documents(list(unique_rows.values()))}
+    ranked = []
+    for rows, terms in zip(candidates, terms_per_jd):
+        rows = [(rid, texts[rid], dist, meta) for rid, _, dist, meta in rows]
+        scored, found = rank_jd_results(rows, terms)
+        ranked.append((render_jd_results(scored[:top_k], terms), found))
+    return ranked
+
+
+def build_where(include_notes: bool = True, min_years: int = 0, education: Optional[List[str]] = None):
+    """Translate search filters into a Chroma ``where`` clause."""
+    clauses: List[Dict[str, Any]] = []
+    if not include_notes:
+        clauses.append({"type": "resume"})
+    if min_years:
+        clauses.append({"max_years": {"$gte": min_years}})
+    for level in education or []:
+        if level.lower() in EDUCATION_KEYWORDS:
+            clauses.append({f"edu_{level.lower()}": 1})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def parse_filters(form) -> Dict[str, Any]:
+    """Read the optional ``min_years`` and ``education`` filters from a request form."""
+    try:
+        min_years = int(re.findall(r"\d+", str(form.get("min_years", "")))[0])
+    except IndexError:
+        min_years = 0
+    education = form.get("education", "")
+    if isinstance(education, str):
+        education = education.split(",")
+    education = [str(e).strip() for e in education if str(e).strip()]
+    return {"min_years": min_years, "education": education}
+
+
+class KeywordMatcher:
+    """Finds query terms in documents and highlights them in previews.
+
+    Built once per query. Matching uses an Aho-Corasick automaton (when
+    pyahocorasick is installed) so every term is found in a single pass over
+    the document; highlighting inserts all ``<mark>`` tags in one regex pass.
+    """
+
+    def __init__(self, terms: List[str]):
+        self.terms = list(terms)
+        unique = sorted({t for t in self.terms if t}, key=len, reverse=True)
+        self._unique = set(unique)
+        self._automaton = None
+        if ahocorasick is not None and unique:
+            self._automaton = ahocorasick.Automaton()
+            for term in unique:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        self._variants: Dict[str, List[str]] = {}
+        for term in unique:
+            self._variants.setdefault(term.lower(), []).append(term)
+        self._highlighter = (
+            re.compile(r"(?i)\b(?:" + "|".join(re.escape(t) for t in unique) + r")\b") if unique else None
+        )
+
+    def find(self, doc_lower: str) -> List[str]:
+        """Return the terms contained in ``doc_lower``, in query order."""
+        if self._automaton is None:
+            found = {t for t in self._unique if t in doc_lower}
+        else:
+            found = set()
+            for _, term in self._automaton.iter(doc_lower):
+                found.add(term)
+                if len(found) == len(self._unique):
+                    break
+        return [t for t in self.terms if t in found]
+
+    def highlight(self, text: str, found_terms: List[str]) -> str:
+        """Wrap occurrences of the found terms in ``<mark>`` tags."""
+        if self._highlighter is None or not found_terms:
+            return text
+        found = set(found_terms)
+
+        def mark(m):
+            for term in self._variants.get(m.group(0).lower(), []):
+                if term in found:
+                    return f"<mark>{term}</mark>"
+            return m.group(0)
+
+        return self._highlighter.sub(mark, text)
 
 
 # --- Resume mapping helpers ---
@@ -116,32 +938,91 @@ def _strip_cleaned_suffix(name: str) -> str:
     return base
 
 
-def find_original_resume(cleaned_id: str) -> str | None:
-    if not os.path.isdir(ORIGINAL_RESUMES_FOLDER):
+def _preferred_bases(cleaned_id: str) -> List[str]:
+    return [
+        _strip_cleaned_suffix(cleaned_id),
+        re.sub(r"(?i)_avesta_cleaned$", "", os.path.splitext(cleaned_id)[0]),
+        os.path.splitext(cleaned_id)[0],
+    ]
+
+
+class OriginalResumeIndex:
+    """Filename index over ORIGINAL_RESUMES_FOLDER.
+
+    The directory is listed once and re-listed only when its mtime changes.
+    Exact names resolve through dict lookups, stem prefixes through a bisect
+    over the sorted stems, and resolved ids are memoized until the next
+    refresh.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self._mtime = None
+        self._names: set = set()
+        self._by_lower: Dict[str, str] = {}
+        self._stems: List[Tuple[str, str]] = []
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> bool:
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return mtime is not None
+        names, by_lower, stems = set(), {}, []
+        if mtime is not None and os.path.isdir(self.folder):
+            for fname in os.listdir(self.folder):
+                if not os.path.isfile(os.path.join(self.folder, fname)):
+                    continue
+                lower = fname.lower()
+                names.add(fname)
+                by_lower.setdefault(lower, fname)
+                if lower.endswith(".pdf") or lower.endswith(".docx"):
+                    stems.append((os.path.splitext(lower)[0], fname))
+        stems.sort()
+        self._names, self._by_lower, self._stems = names, by_lower, stems
+        self._resolved = {}
+        self._mtime = mtime
+        return mtime is not None
+
+    def _prefix_match(self, prefix: str) -> Optional[str]:
+        pos = bisect.bisect_left(self._stems, (prefix, ""))
+        if pos < len(self._stems) and self._stems[pos][0].startswith(prefix):
+            return self._stems[pos][1]
         return None
-    preferred_bases = []
-    preferred_bases.append(_strip_cleaned_suffix(cleaned_id))
-    preferred_bases.append(re.sub(r"(?i)_avesta_cleaned$", "", os.path.splitext(cleaned_id)[0]))
-    preferred_bases.append(os.path.splitext(cleaned_id)[0])
-
-    originals = [f for f in os.listdir(ORIGINAL_RESUMES_FOLDER) if os.path.isfile(os.path.join(ORIGINAL_RESUMES_FOLDER, f))]
-    originals_lower = [f.lower() for f in originals]
-
-    for base in preferred_bases:
-        for ext in (".pdf", ".docx"):
-            candidate = base + ext
-            if candidate in originals or candidate.lower() in originals_lower:
-                if candidate in originals:
+
+    def _resolve(self, cleaned_id: str) -> Optional[str]:
+        bases = _preferred_bases(cleaned_id)
+        for base in bases:
+            for ext in (".pdf", ".docx"):
+                candidate = base + ext
+                if candidate in self._names:
                     return candidate
-                return originals[originals_lower.index(candidate.lower())]
+                original = self._by_lower.get(candidate.lower())
+                if original is not None:
+                    return original
+        for base in bases:
+            original = self._prefix_match(base.lower())
+            if original is not None:
+                return original
+        return None
+
+    def lookup(self, cleaned_id: str) -> Optional[str]:
+        with self._lock:
+            if not self._refresh():
+                return None
+            if cleaned_id not in self._resolved:
+                self._resolved[cleaned_id] = self._resolve(cleaned_id)
+            return self._resolved[cleaned_id]
 
-    for base in preferred_bases:
-        base_lower = base.lower()
-        for orig, orig_l in zip(originals, originals_lower):
-            stem = os.path.splitext(orig_l)[0]
-            if stem.startswith(base_lower) and (orig_l.endswith('.pdf') or orig_l.endswith('.docx')):
-                return orig
-    return None
+
+original_resume_index = OriginalResumeIndex(ORIGINAL_RESUMES_FOLDER)
+
+
+def find_original_resume(cleaned_id: str) -> str | None:
+    return original_resume_index.lookup(cleaned_id)
 
 
 def display_name_from_id(file_id: str) -> str:
@@ -150,8 +1031,33 @@ def display_name_from_id(file_id: str) -> str:
     return parts[0].strip() if parts else stem.strip()
 
 
-# Initialize
-index_if_needed()
+# Initialize in the background (skipped in encoding pool workers, which re-import this module)
+if multiprocessing.parent_process() is None:
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+@app.before_request
+def start_stage_timing():
+    # Only matched routes are timed; their rule is the histogram label, so unknown URLs add no series
+    if request.url_rule is not None and request.url_rule.rule.startswith("/api/search/"):
+        if _ready.is_set():
+            follow_index_version()
+        g.stage_timing = stage_metrics.start()
+
+
+@app.after_request
+def add_server_timing(response):
+    token = g.pop("stage_timing", None)
+    timings = stage_metrics.finish(token, request.url_rule.rule if request.url_rule is not None else "")
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+
+@app.teardown_request
+def discard_stage_timing(exc):
+    # Only set here when the request failed before after_request ran
+    stage_metrics.discard(g.pop("stage_timing", None))
 
 
 @app.get("/")
@@ -159,34 +1065,31 @@ def home():
     return render_template("index.html")
 
 
-@app.post("/api/search/jd")
-def api_search_jd():
-    jd = request.form.get("jd", "").strip()
-    if not jd:
-        return jsonify({"results": []})
+def jd_terms(jd: str) -> List[str]:
+    """Significant keywords of a JD (exclude common/short words), sorted and unique."""
+    raw_terms = [t.lower() for t in re.findall(r"\b[a-zA-Z][a-zA-Z0-9+#\.\-]{2,}\b", jd)]
+    query_terms = [w for w in raw_terms if w not in STOPWORDS]
+    return sorted(set(query_terms))
 
-    # --- Semantic search (works for full JD) ---
-    results = search_profiles(jd, top_k=10, include_notes=False)
 
-    # Extract significant keywords from JD (exclude common/short words)
-    raw_terms = [t.lower() for t in re.findall(r"\b[a-zA-Z][a-zA-Z0-9+#\.\-]{2,}\b", jd)]
-    stopwords = {
-        "the","and","with","for","a","an","in","on","of","to","is","at","as","by","or","be",
-        "are","from","this","that","it","we","you","our","their","your","will","can","may","must",
-        "within","using","use","used","via","into","out","up","down","over","under","per","new","old",
-        "etc","i","ii","iii","iv","v","ability","strong","excellent","good","great","well","high","low",
-        "work","role","job","position","team","experience","experiences","background","candidate","candidates"
-    }
-    query_terms = [w for w in raw_terms if w not in stopwords]
-    unique_terms = sorted(set(query_terms))
+def rank_jd_results(results, unique_terms: List[str]) -> Tuple[List[Tuple], bool]:
+    """Weight JD candidates by semantic similarity and keyword overlap, best first.
 
-    payload = []
+    Previews are built separately by render_jd_results(), so only the
+    requested page pays for them. Rows are
+    ``(rid, dist, meta, found_terms, semantic_sim, match_percent)``; document
+    bodies are dropped once the keyword overlap is known.
+    """
+    if unique_terms:
+        results = with_documents(results)
+
+    matcher = KeywordMatcher(unique_terms)
+    ranked = []
     any_keywords_found = False
     for rid, doc, dist, meta in results:
-        doc_lower = doc.lower()
-
         # Keyword overlap
-        found_terms = [term for term in unique_terms if term in doc_lower]
+        with stage_metrics.stage("keyword_overlap"):
+            found_terms = matcher.find(doc.lower()) if unique_terms else []
         overlap_ratio = (len(set(found_terms)) / len(unique_terms)) if unique_terms else 0.0
 
         # Semantic similarity from vector search
@@ -197,14 +1100,25 @@ def api_search_jd():
 
         if found_terms:
             any_keywords_found = True
+        ranked.append((rid, dist, meta, found_terms, semantic_sim, match_percent))
+
+    # Sort by match_percent desc
+    ranked.sort(key=lambda r: r[5], reverse=True)
+    return ranked, any_keywords_found
 
+
+def render_jd_results(ranked, unique_terms: List[str]) -> List[Dict[str, Any]]:
+    """Response entries for rows from rank_jd_results()."""
+    matcher = KeywordMatcher(unique_terms)
+    payload = []
+    for rid, dist, meta, found_terms, semantic_sim, match_percent in ranked:
         # Build preview and highlight only found terms
-        preview_raw = " ".join(doc.split()[:80])
-        for kw in sorted(set(found_terms), key=len, reverse=True):
-            preview_raw = re.sub(rf"(?i)\b{re.escape(kw)}\b", f"<mark>{kw}</mark>", preview_raw)
-        preview = preview_raw + "..."
+        with stage_metrics.stage("highlight"):
+            preview_raw = preview_words(None, meta, 80)
+            preview = matcher.highlight(preview_raw, found_terms) + "..."
 
-        original = find_original_resume(rid)
+        with stage_metrics.stage("original_lookup"):
+            original = find_original_resume(rid)
         payload.append({
             "id": rid,
             "name": display_name_from_id(rid),
@@ -216,38 +1130,92 @@ def api_search_jd():
             "keywords_found": found_terms,
             "match_type": "✅ Keywords found" if found_terms else "⚠️ Semantic match only"
         })
+    return payload
 
-    # Sort by match_percent desc
-    payload.sort(key=lambda r: r.get("match_percent", 0), reverse=True)
 
-    message = (
+def jd_message(any_keywords_found: bool) -> str:
+    return (
         "✅ Showing top matches with weighted match percentage."
         if any_keywords_found else
         "⚠️ No direct keyword overlaps — showing top semantic matches ranked by relevance."
     )
 
-    return jsonify({"results": payload[:5], "message": message})
+
+@app.post("/api/search/jd")
+@require_ready
+@cached_search("jd", ("jd", "min_years", "education"))
+def api_search_jd():
+    jd = request.form.get("jd", "").strip()
+    if not jd:
+        return {"results": []}
+    try:
+        offset, limit = parse_page(request.form)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    unique_terms = jd_terms(jd)
+
+    def rank():
+        # --- Hybrid search: semantic (full JD) fused with BM25 over the keywords ---
+        results = hybrid_search(
+            jd, " ".join(unique_terms), top_k=SEARCH_DEPTH, include_notes=False, filters=parse_filters(request.form)
+        )
+        return rank_jd_results(results, unique_terms)
+
+    ranked, any_keywords_found = ranked_results(rank)
+    page, next_cursor = page_of(ranked, offset, limit)
+    return {
+        "results": render_jd_results(page, unique_terms),
+        "message": jd_message(any_keywords_found),
+        "next_cursor": next_cursor,
+        "total": len(ranked),
+    }
+
+
+@app.post("/api/search/jd/batch")
+@require_ready
+def api_search_jd_batch():
+    data = request.get_json(silent=True)
+    source = data if isinstance(data, dict) else request.form
+    jds = source.get("jds") if isinstance(data, dict) else request.form.getlist("jd")
+    jds = [jd.strip() for jd in (jds or []) if isinstance(jd, str) and jd.strip()]
+    if not jds:
+        return jsonify({"results": []})
+    if len(jds) > JD_BATCH_MAX:
+        return jsonify({"error": f"At most {JD_BATCH_MAX} job descriptions per batch"}), 400
+    try:
+        top_k = max(1, min(int(source.get("top_k", 5)), 50))
+    except (TypeError, ValueError):
+        top_k = 5
+
+    ranked = rank_jds(jds, top_k, parse_filters(source))
+    return jsonify({
+        "results": [
+            {"jd_index": i, "results": payload, "message": jd_message(found)}
+            for i, (payload, found) in enumerate(ranked)
+        ]
+    })
 
 # --- Helper function to process search results ---
 def process_search_results(results, query_terms):
-    def highlight_keywords(text, keywords):
-        for kw in sorted(set(keywords), key=len, reverse=True):
-            pattern = re.compile(rf"(?i)\b{re.escape(kw)}\b")
-            text = pattern.sub(f"<mark>{kw}</mark>", text)
-        return text
+    if query_terms:
+        results = with_documents(results)
 
+    matcher = KeywordMatcher(query_terms)
     payload = []
     exact_found = False
     for rid, doc, dist, meta in results:
-        doc_lower = doc.lower()
-        found_terms = [term for term in query_terms if term in doc_lower]
+        with stage_metrics.stage("keyword_overlap"):
+            found_terms = matcher.find(doc.lower()) if query_terms else []
         found = len(found_terms) > 0
         if found:
             exact_found = True
 
-        preview_raw = " ".join(doc.split()[:60])
-        preview = highlight_keywords(preview_raw, found_terms) + "..."
-        original = find_original_resume(rid)
+        with stage_metrics.stage("highlight"):
+            preview_raw = preview_words(doc, meta, 60)
+            preview = matcher.highlight(preview_raw, found_terms) + "..."
+        with stage_metrics.stage("original_lookup"):
+            original = find_original_resume(rid)
 
         payload.append({
             "id": rid,
@@ -270,6 +1238,8 @@ def process_search_results(results, query_terms):
 
 
 @app.post("/api/search/skills")
+@require_ready
+@cached_search("skills", ("skills", "years", "min_years", "education"))
 def api_search_skills():
     skills_input = request.form.get("skills", "").strip()
     years_input = request.form.get("years", "0").strip()
@@ -279,52 +1249,116 @@ def api_search_skills():
         min_years = 0
     skills = [s.strip() for s in skills_input.split(",") if s.strip()]
 
-    semantic_query = ", ".join(skills) + (f", {min_years} years" if min_years else "")
-    candidates = search_profiles(semantic_query, top_k=10, include_notes=False)
+    try:
+        offset, limit = parse_page(request.form)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    def rank():
+        semantic_query = ", ".join(skills) + (f", {min_years} years" if min_years else "")
+        candidates = hybrid_search(
+            semantic_query, " ".join(skills), top_k=SEARCH_DEPTH, include_notes=False, filters=parse_filters(request.form)
+        )
 
-    rescored = []
-    for rid, doc, dist, meta in candidates:
-        skill_score = score_skills_and_experience(doc, skills, min_years)
-        combined = (1 - dist) + 0.3 * skill_score
-        rescored.append((combined, rid, doc, dist, meta))
-    rescored.sort(reverse=True)
+        rescored = []
+        for rid, doc, dist, meta in candidates:
+            skill_score = score_skills_and_experience(meta, skills, min_years)
+            combined = (1 - dist) + 0.3 * skill_score
+            rescored.append((combined, rid, dist, meta))
+        rescored.sort(key=lambda r: r[0], reverse=True)
+        return [(rid, None, dist, meta) for _, rid, dist, meta in rescored]
 
-    results = [(rid, doc, dist, meta) for _, rid, doc, dist, meta in rescored[:5]]
+    ranked = ranked_results(rank)
+    results, next_cursor = page_of(ranked, offset, limit)
     payload, message = process_search_results(results, skills)
 
-    return jsonify({"results": payload, "message": message})
+    return {"results": payload, "message": message, "next_cursor": next_cursor, "total": len(ranked)}
 
 
 @app.post("/api/search/education")
+@require_ready
+@cached_search("education", ("levels", "min_years", "education"))
 def api_search_education():
     edu_input = request.form.get("levels", "").strip()
     levels = [e.strip() for e in edu_input.split(",") if e.strip()]
-    semantic_query = "candidates with " + ", ".join(levels)
-    candidates = search_profiles(semantic_query, top_k=10, include_notes=False)
+    try:
+        offset, limit = parse_page(request.form)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    def rank():
+        semantic_query = "candidates with " + ", ".join(levels)
+        candidates = search_profiles(
+            semantic_query, top_k=SEARCH_DEPTH, include_notes=False, filters=parse_filters(request.form)
+        )
 
-    rescored = []
-    for rid, doc, dist, meta in candidates:
-        edu_score = score_education(doc, levels)
-        combined = (1 - dist) + 0.4 * edu_score
-        rescored.append((combined, rid, doc, dist, meta))
-    rescored.sort(reverse=True)
+        rescored = []
+        for rid, doc, dist, meta in candidates:
+            edu_score = score_education(meta, levels)
+            combined = (1 - dist) + 0.4 * edu_score
+            rescored.append((combined, rid, dist, meta))
+        rescored.sort(key=lambda r: r[0], reverse=True)
+        return [(rid, None, dist, meta) for _, rid, dist, meta in rescored]
 
-    results = [(rid, doc, dist, meta) for _, rid, doc, dist, meta in rescored[:5]]
+    ranked = ranked_results(rank)
+    results, next_cursor = page_of(ranked, offset, limit)
     payload, message = process_search_results(results, levels)
 
-    return jsonify({"results": payload, "message": message})
+    return {"results": payload, "message": message, "next_cursor": next_cursor, "total": len(ranked)}
 
 
 @app.post("/api/search/general")
+@require_ready
+@cached_search("general", ("q", "include_notes", "min_years", "education"))
 def api_search_general():
     q = request.form.get("q", "").strip()
     include_notes = request.form.get("include_notes", "n").lower() == "y"
-    results = search_profiles(q, top_k=5, include_notes=include_notes)
+    try:
+        offset, limit = parse_page(request.form)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    ranked = ranked_results(
+        lambda: search_profiles(q, top_k=SEARCH_DEPTH, include_notes=include_notes, filters=parse_filters(request.form))
+    )
+    results, next_cursor = page_of(ranked, offset, limit)
 
     query_terms = [term.lower() for term in re.findall(r"\b\w+\b", q)]
     payload, message = process_search_results(results, query_terms)
 
-    return jsonify({"results": payload, "message": message})
+    return {"results": payload, "message": message, "next_cursor": next_cursor, "total": len(ranked)}
+
+
+@app.post("/api/index/sync")
+@require_ready
+def api_index_sync():
+    return jsonify(sync_index())
+
+
+@app.get("/healthz")
+def healthz():
+    return jsonify({"status": "ok"})
+
+
+@app.get("/readyz")
+def readyz():
+    status = warmup_status()
+    return jsonify(status), (200 if status["ready"] else 503)
+
+
+@app.get("/api/cache/stats")
+def api_cache_stats():
+    return jsonify({
+        "query_embeddings": query_cache.stats() if query_cache is not None else None,
+        "query_batching": query_batcher.stats() if query_batcher is not None else None,
+        "search_results": result_cache.stats(),
+        "ranked_lists": ranked_cache.stats(),
+    })
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(stage_metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
 
 
 @app.get("/resume/<path:filename>")
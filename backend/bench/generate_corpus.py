@@ -0,0 +1,198 @@
+"""
+Synthetic resume/JD corpus generator for the search benchmarks.
+
+Seeds are the real sample resumes: PDF/DOCX files in the repo's ``resumes/``
+folder (needs PyPDF2 / python-docx, as in flask-backend) and any cleaned
+``.txt`` resumes. Each synthetic resume is stitched together from blocks of
+two seed resumes, with the name, years of experience and a few skills
+swapped, and is written the way the backend expects it:
+
+    <out>/cleaned_resumes/<First Last NNNNNNN>_<Role>_<Code>_Avesta_cleaned.txt
+    <out>/resumes/<First Last NNNNNNN>_<Role>_<Code>_Avesta.pdf   (empty placeholder)
+    <out>/jds.json                                               (synthetic JDs)
+
+Usage:
+    python bench/generate_corpus.py --size 10000 --out /tmp/hiresight-10k
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from collections import Counter
+from typing import Dict, List, Tuple
+
+try:
+    from PyPDF2 import PdfReader
+except ImportError:  # optional; PDF seeds are skipped without it
+    PdfReader = None
+try:
+    from docx import Document
+except ImportError:  # optional; DOCX seeds are skipped without it
+    Document = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+DEFAULT_SEED_DIRS = [
+    os.path.join(REPO_DIR, "resumes"),
+    os.path.join(BACKEND_DIR, "resumes"),
+    os.path.join(BACKEND_DIR, "cleaned_resumes"),
+]
+
+TOKEN_PATTERN = re.compile(r"\b[A-Za-z][A-Za-z0-9+#\.\-]{1,}\b")
+YEARS_PATTERN = re.compile(r"\b(\d{1,2})\s*\+?\s*(years?|yrs?)\b", re.IGNORECASE)
+COMMON_WORDS = {
+    "and", "the", "with", "for", "from", "that", "this", "have", "has", "was", "were", "are", "will",
+    "using", "used", "work", "worked", "working", "team", "project", "projects", "experience", "years",
+    "year", "responsible", "developed", "development", "based", "various", "also", "into", "over",
+    "client", "clients", "data", "system", "systems", "application", "applications", "company",
+    "summary", "skills", "education", "profile", "objective", "certifications", "languages",
+}
+
+
+def extract_seed_text(path: str) -> str:
+    """Plain text of a seed resume, or an empty string if it cannot be read."""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == ".txt":
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return f.read()
+        if ext == ".pdf" and PdfReader is not None:
+            reader = PdfReader(path)
+            return "\n".join(page.extract_text() or "" for page in reader.pages)
+        if ext == ".docx" and Document is not None:
+            return "\n".join(p.text for p in Document(path).paragraphs)
+    except Exception as e:
+        print(f"Skipping seed {os.path.basename(path)}: {e}")
+    return ""
+
+
+def seed_name_parts(filename: str) -> Tuple[str, str, str]:
+    """``(person, role, code)`` from a sample name like ``Aman Kumar_Data Engineer_ZGN_Avesta.pdf``."""
+    base = re.sub(r"(?i)(_avesta)?(_cleaned)?$", "", os.path.splitext(filename)[0])
+    parts = base.split("_")
+    person = parts[0].strip() if parts else "Candidate"
+    role = parts[1].strip() if len(parts) > 1 else "Software Engineer"
+    code = parts[2].strip() if len(parts) > 2 else "GEN"
+    return person, role, code
+
+
+def load_seeds(seed_dirs: List[str]) -> List[Dict[str, object]]:
+    seeds = []
+    for folder in seed_dirs:
+        if not os.path.isdir(folder):
+            continue
+        for fname in sorted(os.listdir(folder)):
+            text = extract_seed_text(os.path.join(folder, fname))
+            blocks = [b.strip() for b in re.split(r"\n\s*\n|\n(?=[A-Z][A-Z &/]{3,}\n)", text) if b.strip()]
+            if len(text.split()) < 30 or not blocks:
+                continue
+            person, role, code = seed_name_parts(fname)
+            seeds.append({"text": text, "blocks": blocks, "person": person, "role": role, "code": code})
+    return seeds
+
+
+def skill_vocabulary(seeds: List[Dict[str, object]], limit: int = 300) -> List[str]:
+    """Tokens that appear in several seeds but not in nearly all of them."""
+    doc_freq: Counter = Counter()
+    spelling: Dict[str, str] = {}
+    for seed in seeds:
+        tokens = {t.rstrip(".-") for t in TOKEN_PATTERN.findall(seed["text"])}
+        for tok in tokens:
+            low = tok.lower()
+            if low in COMMON_WORDS or len(low) < 2:
+                continue
+            doc_freq[low] += 1
+            spelling.setdefault(low, tok)
+    max_df = max(2, int(0.8 * len(seeds)))
+    vocab = [w for w, df in doc_freq.most_common() if 2 <= df <= max_df]
+    if not vocab:
+        # Too few (or too similar) seeds to tell skills from boilerplate
+        vocab = [w for w, _ in doc_freq.most_common()]
+    return [spelling[w] for w in vocab[:limit]]
+
+
+def synth_resume(rng: random.Random, seeds, vocab: List[str], person: str, base) -> str:
+    other = rng.choice(seeds)
+    blocks = list(base["blocks"])
+    # Swap a third of the blocks for blocks of another resume
+    for i in rng.sample(range(len(blocks)), k=max(1, len(blocks) // 3)):
+        blocks[i] = rng.choice(other["blocks"])
+    text = "\n\n".join(blocks)
+    for seed_person in {base["person"], other["person"]}:
+        text = text.replace(seed_person, person)
+    text = YEARS_PATTERN.sub(lambda m: f"{rng.randint(1, 20)} {m.group(2)}", text)
+    extra = rng.sample(vocab, k=min(len(vocab), rng.randint(3, 8)))
+    return text + "\n\nSkills: " + ", ".join(extra) + "\n"
+
+
+def synth_jd(rng: random.Random, seeds, vocab: List[str]) -> str:
+    seed = rng.choice(seeds)
+    skills = rng.sample(vocab, k=min(len(vocab), rng.randint(4, 8)))
+    context = rng.choice(seed["blocks"])
+    return (
+        f"We are hiring a {seed['role']} with {rng.randint(1, 12)}+ years of experience. "
+        f"Must have hands-on skills in {', '.join(skills)}. "
+        f"{' '.join(context.split()[:60])}"
+    )
+
+
+def generate(
+    size: int,
+    out_dir: str,
+    n_jds: int = 200,
+    seed: int = 13,
+    seed_dirs: List[str] = None,
+) -> Dict[str, object]:
+    """Write ``size`` synthetic resumes and ``n_jds`` JDs under ``out_dir``."""
+    seeds = load_seeds(seed_dirs or DEFAULT_SEED_DIRS)
+    if not seeds:
+        raise RuntimeError(
+            "No readable seed resumes; install PyPDF2 and python-docx or add cleaned .txt resumes"
+        )
+    vocab = skill_vocabulary(seeds)
+    rng = random.Random(seed)
+    first_names = sorted({s["person"].split()[0] for s in seeds})
+    last_names = sorted({s["person"].split()[-1] for s in seeds})
+
+    cleaned_dir = os.path.join(out_dir, "cleaned_resumes")
+    originals_dir = os.path.join(out_dir, "resumes")
+    os.makedirs(cleaned_dir, exist_ok=True)
+    os.makedirs(originals_dir, exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "interview_notes"), exist_ok=True)
+
+    for i in range(size):
+        owner = rng.choice(seeds)
+        person = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+        stem = f"{person} {i:07d}_{owner['role']}_{owner['code']}_Avesta"
+        with open(os.path.join(cleaned_dir, f"{stem}_cleaned.txt"), "w", encoding="utf-8") as f:
+            f.write(synth_resume(rng, seeds, vocab, person, owner))
+        open(os.path.join(originals_dir, f"{stem}.pdf"), "wb").close()
+
+    jds = [synth_jd(rng, seeds, vocab) for _ in range(n_jds)]
+    with open(os.path.join(out_dir, "jds.json"), "w", encoding="utf-8") as f:
+        json.dump({"jds": jds, "skills": vocab}, f)
+
+    print(f"Generated {size} resumes and {n_jds} JDs from {len(seeds)} seeds in {out_dir}")
+    return {"resumes": size, "jds": n_jds, "seeds": len(seeds), "vocabulary": len(vocab)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume corpus from the sample resumes")
+    parser.add_argument("--size", type=int, required=True, help="Number of resumes to generate")
+    parser.add_argument("--out", required=True, help="Output folder")
+    parser.add_argument("--jds", type=int, default=200, help="Number of job descriptions to generate")
+    parser.add_argument("--seed", type=int, default=13, help="Random seed")
+    parser.add_argument("--seed-dir", action="append", help="Folder with seed resumes (repeatable)")
+    args = parser.parse_args(argv)
+    try:
+        generate(args.size, args.out, args.jds, args.seed, args.seed_dir)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
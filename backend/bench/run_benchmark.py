@@ -0,0 +1,277 @@
+"""
+Scale benchmark for the search backend.
+
+For every corpus size a synthetic corpus is generated (see generate_corpus.py)
+and a fresh worker process imports ``app.py`` with its data folders pointed at
+that corpus. The worker measures:
+
+- indexing: the warm-up sync (embedding, Chroma writes, BM25, manifest)
+- latency: p50/p95/p99 per search endpoint through the Flask test client,
+  plus ``search_profiles`` and ``find_original_resume`` on their own
+- memory: resident set size after indexing and peak RSS of the worker
+
+Results are written as JSON. With ``--baseline`` the p95 latencies and
+indexing throughput are compared to an earlier run and the script exits
+non-zero when one regresses by more than ``--max-regression``.
+
+Usage:
+    python bench/run_benchmark.py --sizes 1000,10000 --queries 200 --output bench_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+import generate_corpus
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+ENDPOINTS = ["jd", "skills", "education", "general"]
+EDUCATION_LEVELS = ["phd", "masters", "bachelors"]
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"count": 0}
+    arr = np.asarray(samples_ms)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "count": len(arr),
+        "mean": round(float(arr.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(arr.max()), 3),
+    }
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def endpoint_form(endpoint: str, rng: random.Random, jds: List[str], skills: List[str]) -> Dict[str, str]:
+    if endpoint == "jd":
+        return {"jd": rng.choice(jds)}
+    if endpoint == "skills":
+        return {"skills": ", ".join(rng.sample(skills, k=min(len(skills), 3))), "years": str(rng.randint(0, 8))}
+    if endpoint == "education":
+        return {"levels": ", ".join(rng.sample(EDUCATION_LEVELS, k=rng.randint(1, 2)))}
+    return {"q": " ".join(rng.sample(skills, k=min(len(skills), 2))), "include_notes": "n"}
+
+
+def time_calls(fn, args_list) -> List[float]:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_worker(corpus_dir: str, queries: int, seed: int) -> Dict[str, Any]:
+    """Index ``corpus_dir`` in this process and time the search paths."""
+    sys.path.insert(0, BACKEND_DIR)
+    started = time.perf_counter()
+    import app as hs
+
+    # warm_up() only sets _ready on success, so watch for a failed stage as well
+    while not hs._ready.wait(timeout=0.5):
+        if hs._warmup["stage"] == "failed":
+            raise RuntimeError(f"Warm-up failed: {hs._warmup['error']}")
+    sync = hs._warmup["sync"] or {}
+    indexing = {
+        "documents": sync.get("indexed", 0),
+        "sync_seconds": sync.get("seconds"),
+        "docs_per_sec": round(sync["indexed"] / sync["seconds"], 2) if sync.get("seconds") else None,
+        "warmup_seconds": round(time.perf_counter() - started, 3),
+    }
+    memory = {"rss_after_index_mb": rss_mb()}
+
+    with open(os.path.join(corpus_dir, "jds.json"), "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    jds, skills = corpus["jds"], corpus["skills"]
+    rng = random.Random(seed)
+    client = hs.app.test_client()
+
+    latency: Dict[str, Any] = {}
+    for endpoint in ENDPOINTS:
+        forms = [endpoint_form(endpoint, rng, jds, skills) for _ in range(queries)]
+        # One untimed call so lazy per-endpoint setup is not counted
+        client.post(f"/api/search/{endpoint}", data=forms[0])
+        samples = []
+        for form in forms:
+            start = time.perf_counter()
+            resp = client.post(f"/api/search/{endpoint}", data=form)
+            samples.append((time.perf_counter() - start) * 1000)
+            if resp.status_code != 200:
+                raise RuntimeError(f"/api/search/{endpoint} returned {resp.status_code}")
+        latency[f"/api/search/{endpoint}"] = percentiles(samples)
+
+    queries_text = [(rng.choice(jds), 10, False) for _ in range(queries)]
+    latency["search_profiles"] = percentiles(time_calls(hs.search_profiles, queries_text))
+    ids = hs.collection.get(include=[])["ids"]
+    lookups = [(doc_id,) for doc_id in rng.sample(ids, k=min(len(ids), queries))]
+    # List the folder once, then time cold (not yet memoized) id resolutions
+    hs.find_original_resume(ids[0] if ids else "")
+    hs.original_resume_index._resolved.clear()
+    latency["find_original_resume"] = percentiles(time_calls(hs.find_original_resume, lookups))
+
+    memory["peak_rss_mb"] = peak_rss_mb()
+    return {
+        "indexing": indexing,
+        "memory_mb": memory,
+        "latency_ms": latency,
+        "embedding_backend": (hs._warmup["embedding_backend"] or {}).get("name"),
+        "vector_store": hs.vector_store.name,
+    }
+
+
+def run_size(size: int, args) -> Dict[str, Any]:
+    corpus_dir = os.path.join(args.workdir, f"corpus-{size}")
+    if not os.path.isfile(os.path.join(corpus_dir, "jds.json")):
+        generate_corpus.generate(size, corpus_dir, n_jds=max(args.queries, 50), seed=args.seed)
+    db_dir = os.path.join(corpus_dir, "resume_db")
+    shutil.rmtree(db_dir, ignore_errors=True)
+
+    env = dict(
+        os.environ,
+        CLEANED_FOLDER=os.path.join(corpus_dir, "cleaned_resumes"),
+        INTERVIEW_FOLDER=os.path.join(corpus_dir, "interview_notes"),
+        ORIGINAL_RESUMES_FOLDER=os.path.join(corpus_dir, "resumes"),
+        CHROMA_PATH=db_dir,
+    )
+    if not args.with_cache:
+        # Every timed request should run the full pipeline, query embedding included
+        env["RESULT_CACHE_MAX_ENTRIES"] = "0"
+        env["EMBED_CACHE_MAX_ENTRIES"] = "0"
+        env.pop("EMBED_CACHE_PATH", None)
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--worker", corpus_dir,
+        "--queries", str(args.queries), "--seed", str(args.seed),
+    ]
+    print(f"[{size}] indexing and querying...")
+    try:
+        proc = subprocess.run(cmd, env=env, cwd=BACKEND_DIR, capture_output=True, text=True, timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Worker for size {size} did not finish within {args.timeout}s")
+    if proc.returncode != 0:
+        raise RuntimeError(f"Worker for size {size} failed:\n{proc.stderr[-4000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["size"] = size
+    return result
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: Dict[str, Any], baseline_path: str, max_regression: float) -> List[str]:
+    """Human-readable regressions of ``results`` against a previous results file."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {run["size"]: run for run in json.load(f)["runs"]}
+    problems = []
+    for run in results["runs"]:
+        old = baseline.get(run["size"])
+        if not old:
+            continue
+        for name, stats in run["latency_ms"].items():
+            before = old["latency_ms"].get(name, {}).get("p95")
+            if before and stats.get("p95") and stats["p95"] > before * (1 + max_regression):
+                problems.append(f"[{run['size']}] {name} p95 {before}ms -> {stats['p95']}ms")
+        before = old["indexing"].get("docs_per_sec")
+        after = run["indexing"].get("docs_per_sec")
+        if before and after and after < before * (1 - max_regression):
+            problems.append(f"[{run['size']}] indexing {before} -> {after} docs/sec")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark indexing, search latency and memory at several corpus sizes")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=200, help="Timed requests per endpoint")
+    parser.add_argument("--seed", type=int, default=13, help="Random seed for corpus and queries")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "hiresight-bench"),
+                        help="Where generated corpora and indexes are kept (reused between runs)")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--with-cache", action="store_true",
+                        help="Keep the search result and query embedding caches enabled")
+    parser.add_argument("--timeout", type=float, default=3600,
+                        help="Seconds allowed per corpus size, indexing included (default: 3600)")
+    parser.add_argument("--baseline", help="Previous results file to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative slowdown (default: 0.2)")
+    parser.add_argument("--worker", metavar="CORPUS_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.queries, args.seed)))
+        # Skip interpreter teardown of the warm-up/batcher threads
+        os._exit(0)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "queries": args.queries,
+            "result_cache": args.with_cache,
+            "env": {k: v for k, v in os.environ.items() if k in {
+                "VECTOR_STORE", "EMBED_BACKEND", "INDEX_WORKERS", "INDEX_BATCH_SIZE", "HYBRID_POOL", "SEARCH_DEPTH",
+            }},
+        },
+        "runs": [],
+    }
+    for size in sizes:
+        run = run_size(size, args)
+        results["runs"].append(run)
+        jd = run["latency_ms"]["/api/search/jd"]
+        print(
+            f"[{size}] {run['indexing']['docs_per_sec']} docs/sec, "
+            f"jd p50 {jd['p50']}ms p95 {jd['p95']}ms p99 {jd['p99']}ms, peak RSS {run['memory_mb']['peak_rss_mb']} MB"
+        )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        problems = compare(results, args.baseline, args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
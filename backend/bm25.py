@@ -0,0 +1,133 @@
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#\.\-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for tok in TOKEN_PATTERN.findall(text.lower()):
+        tok = tok.rstrip(".-")
+        if tok:
+            tokens.append(tok)
+    return tokens
+
+
+class BM25Index:
+    """Persisted inverted index with Okapi BM25 scoring.
+
+    Postings map each term to ``{doc_id: term frequency}``. Documents can be
+    added and removed individually so the index follows incremental syncs.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_type: Dict[str, str] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_len = 0
+        self._lock = threading.RLock()
+        if path:
+            self.load()
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_len
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self.doc_len)
+
+    def add(self, doc_id: str, text: str, doc_type: str = "resume") -> None:
+        with self._lock:
+            self.remove(doc_id)
+            tokens = tokenize(text)
+            counts = Counter(tokens)
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+            self.doc_terms[doc_id] = list(counts)
+            self.doc_len[doc_id] = len(tokens)
+            self.doc_type[doc_id] = doc_type
+            self.total_len += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            if doc_id not in self.doc_len:
+                return
+            for term in self.doc_terms.pop(doc_id, []):
+                docs = self.postings.get(term)
+                if docs is None:
+                    continue
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+            self.total_len -= self.doc_len.pop(doc_id)
+            self.doc_type.pop(doc_id, None)
+
+    def search(self, query: str, top_k: int = 10, doc_type: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return up to ``top_k`` ``(doc_id, score)`` pairs, best first."""
+        with self._lock:
+            n_docs = len(self.doc_len)
+            if n_docs == 0:
+                return []
+            avg_len = self.total_len / n_docs
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    if doc_type is not None and self.doc_type.get(doc_id) != doc_type:
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+            postings, doc_len = state["postings"], state["doc_len"]
+            doc_type, doc_terms = state["doc_type"], state["doc_terms"]
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            return
+        with self._lock:
+            self.postings, self.doc_len = postings, doc_len
+            self.doc_type, self.doc_terms = doc_type, doc_terms
+            self.total_len = sum(self.doc_len.values())
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            state = {
+                "postings": self.postings,
+                "doc_len": self.doc_len,
+                "doc_type": self.doc_type,
+                "doc_terms": self.doc_terms,
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Fuse several ranked id lists into one, best first."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
@@ -0,0 +1,218 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+# Sentences used to check a backend against the PyTorch reference when the
+# corpus has nothing to offer yet
+PROBE_TEXTS = [
+    "Senior data engineer with 6 years of Python, Spark and AWS experience.",
+    "Looking for a React Native developer familiar with TypeScript and REST APIs.",
+    "M.Tech in Computer Science, worked on NLP and computer vision projects.",
+    "Power BI developer skilled in DAX, SQL Server and data modelling.",
+    "Software tester with Selenium, JIRA and agile scrum background.",
+    "candidates with masters, phd",
+]
+
+
+def _normalize_rows(embs: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embs, axis=1, keepdims=True)
+    return embs / np.clip(norms, 1e-12, None)
+
+
+class TorchEmbedder:
+    """SentenceTransformer on the PyTorch backend (the reference)."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.model_name}@{self.name}"
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        embs = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(embs, dtype=np.float32)
+
+
+class QuantizedEmbedder(TorchEmbedder):
+    """SentenceTransformer with its Linear layers dynamically quantized to int8."""
+
+    name = "int8"
+
+    def __init__(self, model_name: str):
+        import torch
+
+        super().__init__(model_name)
+        torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class OnnxEmbedder:
+    """The same model exported to ONNX and run with ONNX Runtime.
+
+    Requires ``optimum[onnxruntime]``. Pooling and normalization mirror the
+    SentenceTransformer pipeline (mean pooling over the attention mask).
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, max_seq_length: int = 256):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.model_name}@{self.name}"
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        out = []
+        for i in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            hidden = np.asarray(hidden, dtype=np.float32)
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            out.append(_normalize_rows(pooled))
+        if not out:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(out).astype(np.float32)
+
+
+BACKENDS = {
+    TorchEmbedder.name: TorchEmbedder,
+    QuantizedEmbedder.name: QuantizedEmbedder,
+    OnnxEmbedder.name: OnnxEmbedder,
+}
+
+
+def cosine_agreement(candidate, reference, texts: List[str]) -> Dict[str, float]:
+    """Per-text cosine between two backends' (normalized) embeddings."""
+    cos = np.sum(candidate.encode(texts) * reference.encode(texts), axis=1)
+    return {"mean": round(float(cos.mean()), 5), "min": round(float(cos.min()), 5)}
+
+
+def load_embedder(
+    backend: str,
+    model_name: str,
+    min_agreement: float = 0.99,
+    validate: bool = True,
+    probe_texts: Optional[List[str]] = None,
+):
+    """Load the configured backend, falling back to PyTorch if it is unusable.
+
+    Non-reference backends are validated against the PyTorch embeddings of
+    ``probe_texts``; if the minimum cosine agreement is below
+    ``min_agreement`` the PyTorch backend is used instead.
+    """
+    backend = (backend or TorchEmbedder.name).lower()
+    if backend not in BACKENDS:
+        print(f"Unknown embedding backend '{backend}', using {TorchEmbedder.name}")
+        backend = TorchEmbedder.name
+    if backend == TorchEmbedder.name:
+        return TorchEmbedder(model_name), None
+
+    try:
+        candidate = BACKENDS[backend](model_name)
+    except ImportError as e:
+        print(f"Embedding backend '{backend}' unavailable ({e}), using {TorchEmbedder.name}")
+        return TorchEmbedder(model_name), None
+    if not validate:
+        return candidate, None
+
+    reference = TorchEmbedder(model_name)
+    agreement = cosine_agreement(candidate, reference, probe_texts or PROBE_TEXTS)
+    if agreement["min"] < min_agreement:
+        print(
+            f"Embedding backend '{backend}' disagrees with {TorchEmbedder.name} "
+            f"(min cosine {agreement['min']} < {min_agreement}), using {TorchEmbedder.name}"
+        )
+        return reference, agreement
+    print(f"Using embedding backend '{backend}' (cosine agreement mean {agreement['mean']}, min {agreement['min']})")
+    return candidate, agreement
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-text encodes into batched model calls.
+
+    Callers block on :meth:`encode` while a worker thread drains the queue:
+    it takes whatever is already waiting, then keeps collecting for up to
+    ``window_ms`` or until ``max_batch`` texts, and encodes them in one call.
+    Requests arriving while a batch is being encoded form the next batch.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], window_ms: float = 2.0, max_batch: int = 32):
+        self._encode = encode
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, text: str) -> np.ndarray:
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                embs = self._encode(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            by_text = dict(zip(texts, embs))
+            for text, future in batch:
+                future.set_result(by_text[text])
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
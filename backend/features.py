@@ -0,0 +1,117 @@
+"""Structured document features stored as vector-store metadata at index time.
+
+Skills are matched on tokens that keep digits and the symbols used inside
+skill names, so "C++", "C#", "EC2", "k8s" and "R" are all matchable.
+Multi-token skills ("AWS S3", "machine learning", "c++") must appear as a
+phrase, checked through the document's adjacent token pairs.
+
+The examples below run with ``python -m doctest features.py``.
+"""
+
+import re
+from typing import Any, Dict, List, Set, Tuple
+
+# Words and the symbols that occur inside skill names (c++, c#, node.js, ci/cd, objective-c)
+SKILL_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[+#./\-]")
+YEARS_PATTERN = re.compile(r"(\d+)\s*(?:\+?\s*)?(?:years|yrs|year)\b", re.IGNORECASE)
+EDUCATION_KEYWORDS = {
+    "phd": ["phd", "doctor of philosophy"],
+    "masters": ["masters", "m.s.", "ms ", "m.tech", "mtech", "m.sc", "msc"],
+    "bachelors": ["bachelors", "b.e.", "btech", "b.tech", "b.sc", "bsc", "bca", "b.eng"],
+}
+STOPWORDS = {
+    "the","and","with","for","a","an","in","on","of","to","is","at","as","by","or","be",
+    "are","from","this","that","it","we","you","our","their","your","will","can","may","must",
+    "within","using","use","used","via","into","out","up","down","over","under","per","new","old",
+    "etc","i","ii","iii","iv","v","ability","strong","excellent","good","great","well","high","low",
+    "work","role","job","position","team","experience","experiences","background","candidate","candidates"
+}
+# Bump when extract_features() changes so sync_index() rewrites stored metadata
+FEATURES_VERSION = 3
+# Words kept in the index-time preview snippet (previews use up to 80)
+SNIPPET_WORDS = 80
+
+
+def skill_tokens(text: str) -> List[str]:
+    """Lowercased word and symbol tokens, in order.
+
+    >>> skill_tokens("C++, C#, EC2 and AWS S3")
+    ['c', '+', '+', 'c', '#', 'ec2', 'and', 'aws', 's3']
+    """
+    return SKILL_TOKEN_PATTERN.findall(text.lower())
+
+
+def _is_word(token: str) -> bool:
+    return token[0].isalnum() and token not in STOPWORDS
+
+
+def skill_features(text: str) -> Dict[str, str]:
+    """Single-token skills and adjacent token pairs, each comma-joined."""
+    tokens = skill_tokens(text)
+    words = {t for t in tokens if _is_word(t)}
+    pairs = {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+    return {"skills": ",".join(sorted(words)), "skill_pairs": ",".join(sorted(pairs))}
+
+
+def _skill_sets(meta: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+    return set((meta.get("skills") or "").split(",")), set((meta.get("skill_pairs") or "").split(","))
+
+
+def _has_skill(words: Set[str], pairs: Set[str], skill: str) -> bool:
+    tokens = skill_tokens(skill)
+    if not tokens:
+        return False
+    if len(tokens) == 1:
+        return _is_word(tokens[0]) and tokens[0] in words
+    return all(f"{a} {b}" in pairs for a, b in zip(tokens, tokens[1:]))
+
+
+def has_skill(meta: Dict[str, Any], skill: str) -> bool:
+    """Whether the document described by ``meta`` mentions ``skill`` (as a phrase).
+
+    >>> meta = extract_features("Worked with C++, C#, EC2, S3, k8s, R and Python for 5 years")
+    >>> [s for s in ["C++", "C#", "EC2", "k8s", "R", "python3", "AWS S3", "Java"] if has_skill(meta, s)]
+    ['C++', 'C#', 'EC2', 'k8s', 'R']
+    >>> has_skill(extract_features("Deployed on AWS S3 buckets"), "AWS S3")
+    True
+    """
+    return _has_skill(*_skill_sets(meta), skill)
+
+
+def extract_features(text: str) -> Dict[str, Any]:
+    """Structured features stored as Chroma metadata at index time."""
+    text_lower = text.lower()
+    years = 0
+    for m in YEARS_PATTERN.finditer(text_lower):
+        try:
+            years = max(years, int(m.group(1)))
+        except ValueError:
+            continue
+    features = {
+        "max_years": years,
+        **skill_features(text_lower),
+        "snippet": " ".join(text.split()[:SNIPPET_WORDS]),
+    }
+    for level, keywords in EDUCATION_KEYWORDS.items():
+        features[f"edu_{level}"] = int(any(kw in text_lower for kw in keywords))
+    return features
+
+
+def score_skills_and_experience(meta: Dict[str, Any], required_skills: List[str], min_years: int) -> float:
+    """Score a document from its stored features: 1 per skill present, 0.5 for enough years.
+
+    >>> meta = extract_features("Worked with C++, C#, EC2, S3, k8s, R and Python for 5 years")
+    >>> score_skills_and_experience(meta, ["C++", "EC2", "R"], 3)
+    3.5
+    >>> score_skills_and_experience(extract_features("AWS Lambda, Amazon S3"), ["AWS S3"], 0)
+    0.5
+    """
+    words, pairs = _skill_sets(meta)
+    score = sum(1.0 for skill in required_skills if _has_skill(words, pairs, skill))
+    if meta.get("max_years", 0) >= min_years:
+        score += 0.5
+    return score
+
+
+def score_education(meta: Dict[str, Any], levels: List[str]) -> float:
+    return float(sum(meta.get(f"edu_{level.lower()}", 0) for level in levels))
@@ -0,0 +1,111 @@
+import bisect
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds (Prometheus convention)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage durations of the request being handled in this context; None when not sampled
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class StageMetrics:
+    """Per-request stage timings, aggregated into ``(endpoint, stage)`` histograms.
+
+    A request is timed with probability ``sample_rate``. Code under
+    :meth:`stage` adds its wall time to the current request's timings; outside
+    a sampled request it costs one context-variable lookup.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Begin timing the current request if it is sampled; returns a token for :meth:`finish`."""
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None
+        return _timings.set({}), time.perf_counter()
+
+    def finish(self, token, endpoint: str) -> Optional[Dict[str, float]]:
+        """Stop timing, record the histograms and return the stage durations in seconds."""
+        if token is None:
+            return None
+        var_token, started = token
+        timings = _timings.get() or {}
+        _timings.reset(var_token)
+        timings["total"] = time.perf_counter() - started
+        with self._lock:
+            for name, seconds in timings.items():
+                hist = self._histograms.get((endpoint, name))
+                if hist is None:
+                    hist = self._histograms[(endpoint, name)] = Histogram(self.buckets)
+                hist.observe(seconds)
+        return timings
+
+    def discard(self, token) -> None:
+        """Stop timing without recording (e.g. the request failed)."""
+        if token is not None:
+            _timings.reset(token[0])
+
+    @contextmanager
+    def stage(self, name: str):
+        timings = _timings.get()
+        if timings is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+    def render_prometheus(self, metric: str = "hiresight_search_stage_seconds") -> str:
+        """All histograms in the Prometheus text exposition format."""
+        lines: List[str] = [
+            f"# HELP {metric} Time spent per search request stage.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            items = sorted(self._histograms.items())
+            for (endpoint, name), hist in items:
+                labels = f'endpoint="{escape_label(endpoint)}",stage="{escape_label(name)}"'
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"{metric}_sum{{{labels}}} {hist.sum:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value: str) -> str:
+    """Escape a Prometheus label value (backslash, double quote, newline)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """``Server-Timing`` value with one ``name;dur=<ms>`` entry per stage."""
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
@@ -0,0 +1,255 @@
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# (id, distance, metadata); distances are squared L2 between unit vectors,
+# which is what the Chroma collection reports
+Hit = Tuple[str, float, Dict[str, Any]]
+
+_WHERE_OPS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+}
+
+
+def matches_where(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Chroma-style metadata ``where`` clause in Python."""
+    if not where:
+        return True
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(matches_where(meta, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(matches_where(meta, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            if not all(_WHERE_OPS[op](meta.get(key), value) for op, value in cond.items()):
+                return False
+        elif meta.get(key) != cond:
+            return False
+    return True
+
+
+class VectorStore:
+    """Top-k retrieval over the indexed document embeddings.
+
+    The Chroma collection stays the system of record; a store only answers
+    queries and is told the index version after every sync.
+    """
+
+    name = "base"
+
+    def refresh(self, version: int) -> None:
+        """Pick up index changes up to ``version``."""
+
+    def query(self, embeddings: np.ndarray, top_k: int, where: Optional[Dict[str, Any]] = None) -> List[List[Hit]]:
+        """Best ``top_k`` hits for each row of ``embeddings``, closest first."""
+        raise NotImplementedError
+
+    def get(self, ids: List[str], where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, np.ndarray, Dict[str, Any]]]:
+        """``(id, embedding, metadata)`` for the given ids that match ``where``."""
+        raise NotImplementedError
+
+
+class ChromaStore(VectorStore):
+    name = "chroma"
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def query(self, embeddings, top_k, where=None):
+        res = self.collection.query(
+            query_embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            n_results=top_k,
+            where=where,
+            include=["metadatas", "distances"],
+        )
+        return [
+            list(zip(ids, dists, metas))
+            for ids, dists, metas in zip(res["ids"], res["distances"], res["metadatas"])
+        ]
+
+    def get(self, ids, where=None):
+        got = self.collection.get(ids=ids, where=where, include=["metadatas", "embeddings"])
+        return [
+            (rid, np.asarray(emb, dtype=np.float32), meta)
+            for rid, emb, meta in zip(got["ids"], got["embeddings"], got["metadatas"])
+        ]
+
+
+class NumpyStore(VectorStore):
+    """Exact search over a memory-mapped float16 embedding matrix.
+
+    On each new index version the collection is exported to
+    ``<path>/v<version>/`` (``embeddings.npy``, ``ids.npy``,
+    ``metadatas.json``) and ``<path>/current.json`` is switched to it.
+    Worker processes that open the same version share one page-cached copy
+    of the matrix. Queries are brute-force dot products in row blocks with
+    ``argpartition`` for the top k.
+    """
+
+    name = "numpy"
+
+    def __init__(self, path: str, collection, page_size: int = 5000, block_rows: int = 65536):
+        self.path = path
+        self.collection = collection
+        self.page_size = page_size
+        self.block_rows = block_rows
+        self.version: Optional[int] = None
+        # Swapped as a whole on refresh so queries never see a half-loaded version
+        self._snapshot: Dict[str, Any] = {"ids": [], "matrix": None, "metadatas": [], "positions": {}, "masks": {}}
+        self._lock = threading.Lock()
+
+    def _pointer(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, "current.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def refresh(self, version):
+        with self._lock:
+            if self.version == version:
+                return
+            if self._pointer().get("version") != version:
+                self._export(version)
+            self._load()
+
+    def _export(self, version: int) -> None:
+        target = os.path.join(self.path, f"v{version}")
+        tmp = f"{target}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        count = self.collection.count()
+        ids: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        matrix = None
+        while len(ids) < count:
+            got = self.collection.get(
+                include=["embeddings", "metadatas"], limit=self.page_size, offset=len(ids)
+            )
+            if not got["ids"]:
+                break
+            page = np.asarray(got["embeddings"], dtype=np.float32)
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    os.path.join(tmp, "embeddings.npy"), mode="w+", dtype=np.float16, shape=(count, page.shape[1])
+                )
+            matrix[len(ids):len(ids) + len(page)] = page
+            ids.extend(got["ids"])
+            metadatas.extend(got["metadatas"])
+        if matrix is None:
+            matrix = np.lib.format.open_memmap(
+                os.path.join(tmp, "embeddings.npy"), mode="w+", dtype=np.float16, shape=(0, 0)
+            )
+        matrix.flush()
+        del matrix
+        if len(ids) < count:
+            # The collection shrank while exporting; drop the unused tail rows
+            full = np.load(os.path.join(tmp, "embeddings.npy"))[:len(ids)]
+            np.save(os.path.join(tmp, "embeddings.npy"), full)
+
+        np.save(os.path.join(tmp, "ids.npy"), np.asarray(ids, dtype=str))
+        with open(os.path.join(tmp, "metadatas.json"), "w", encoding="utf-8") as f:
+            json.dump(metadatas, f)
+
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # Another worker exported this version first
+            shutil.rmtree(tmp, ignore_errors=True)
+        pointer_tmp = os.path.join(self.path, f"current.json.tmp-{os.getpid()}")
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "dir": os.path.basename(target)}, f)
+        os.replace(pointer_tmp, os.path.join(self.path, "current.json"))
+
+        for name in os.listdir(self.path):
+            if name.startswith("v") and name != os.path.basename(target) and ".tmp-" not in name:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _load(self) -> None:
+        pointer = self._pointer()
+        folder = os.path.join(self.path, pointer["dir"])
+        ids = np.load(os.path.join(folder, "ids.npy")).tolist()
+        with open(os.path.join(folder, "metadatas.json"), "r", encoding="utf-8") as f:
+            metadatas = json.load(f)
+        self._snapshot = {
+            "ids": ids,
+            "matrix": np.load(os.path.join(folder, "embeddings.npy"), mmap_mode="r"),
+            "metadatas": metadatas,
+            "positions": {doc_id: i for i, doc_id in enumerate(ids)},
+            "masks": {},
+        }
+        self.version = pointer["version"]
+
+    @staticmethod
+    def _mask(snap: Dict[str, Any], where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        key = json.dumps(where, sort_keys=True)
+        mask = snap["masks"].get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (matches_where(m, where) for m in snap["metadatas"]), dtype=bool, count=len(snap["ids"])
+            )
+            snap["masks"][key] = mask
+        return mask
+
+    def query(self, embeddings, top_k, where=None):
+        snap = self._snapshot
+        ids, matrix, metadatas = snap["ids"], snap["matrix"], snap["metadatas"]
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        n = len(ids)
+        if n == 0 or top_k <= 0:
+            return [[] for _ in embeddings]
+        mask = self._mask(snap, where)
+
+        best_scores, best_idx = [], []
+        for start in range(0, n, self.block_rows):
+            block = np.asarray(matrix[start:start + self.block_rows], dtype=np.float32)
+            sims = embeddings @ block.T
+            if mask is not None:
+                sims[:, ~mask[start:start + len(block)]] = -np.inf
+            k = min(top_k, len(block))
+            part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            best_scores.append(np.take_along_axis(sims, part, axis=1))
+            best_idx.append(part + start)
+        scores = np.concatenate(best_scores, axis=1)
+        idx = np.concatenate(best_idx, axis=1)
+        order = np.argsort(-scores, axis=1)[:, :top_k]
+        scores = np.take_along_axis(scores, order, axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+
+        results = []
+        for row_scores, row_idx in zip(scores, idx):
+            results.append([
+                (ids[i], float(max(0.0, 2 - 2 * s)), metadatas[i])
+                for s, i in zip(row_scores, row_idx)
+                if np.isfinite(s)
+            ])
+        return results
+
+    def get(self, ids, where=None):
+        snap = self._snapshot
+        out = []
+        for doc_id in ids:
+            i = snap["positions"].get(doc_id)
+            if i is not None and matches_where(snap["metadatas"][i], where):
+                out.append((doc_id, np.asarray(snap["matrix"][i], dtype=np.float32), snap["metadatas"][i]))
+        return out
+
+
+def make_vector_store(kind: str, collection, numpy_path: str) -> VectorStore:
+    if (kind or "chroma").lower() == NumpyStore.name:
+        return NumpyStore(numpy_path, collection)
+    return ChromaStore(collection)
@@ -7,11 +7,14 @@ from flask import Blueprint, request, jsonify
 import os
 import uuid
 from werkzeug.utils import secure_filename
-from services.resume_parser import resume_parser
+from services.parse_queue import parse_queue, QueueFull
 from services.supabase_client import supabase_service
 
 resume_bp = Blueprint('resume', __name__, url_prefix='/api/resumes')
 
+# Start the parse workers (and pick up jobs left queued by a previous run) with the app
+resume_bp.record_once(lambda state: parse_queue.start())
+
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
@@ -26,8 +29,9 @@ def allowed_file(filename):
 @resume_bp.route('/upload', methods=['POST'])
 def upload_resume():
     """
-    Upload and parse a resume
+    Upload a resume and queue it for parsing
     Expects: file, user_id in form data
+    Returns 202 with the resume id right away; poll /api/resumes/<id>/status
     """
     try:
         # Check if file is present
@@ -46,11 +50,12 @@ def upload_resume():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Only PDF and DOCX files are allowed'}), 400
 
-        # Save file temporarily
+        # Save file; the parse worker removes it once the resume is parsed
         filename = secure_filename(file.filename)
         file_path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4()}_{filename}")
         file.save(file_path)
 
+        queued = False
         try:
             # Get file info
             file_size = os.path.getsize(file_path)
@@ -74,52 +79,75 @@ def upload_resume():
 
             resume_id = resume_record['id']
 
-            # Parse the resume
             try:
-                parsed_data = resume_parser.parse_resume(file_path, file_type)
-                entities = parsed_data['entities']
-
-                # Update resume with parsed data
-                update_data = {
-                    'status': 'parsed',
-                    'skills': entities.get('skills', []),
-                    'experience': [str(exp) for exp in entities.get('experience', [])],
-                    'education': [str(edu) for edu in entities.get('education', [])],
-                    'years_of_experience': entities.get('years_of_experience', 0),
-                    'email': entities.get('email'),
-                    'phone': entities.get('phone'),
-                    'summary': parsed_data['cleaned_text'][:500],
-                    'parsed_data': {
-                        'raw_text': parsed_data['raw_text'][:1000],
-                        'entities': entities
-                    }
-                }
-
-                updated_resume = supabase_service.update_resume(resume_id, update_data)
-
-                return jsonify({
-                    'message': 'Resume uploaded and parsed successfully',
-                    'resume': updated_resume
-                }), 200
-
-            except Exception as parse_error:
-                # Update status to error
-                supabase_service.update_resume(resume_id, {'status': 'error'})
+                parse_queue.enqueue(resume_id, file_path, filename, file_type)
+                queued = True
+            except QueueFull as e:
+                supabase_service.delete_resume(resume_id)
+                response = jsonify({'error': 'Too many resumes waiting to be parsed, try again later',
+                                    'details': str(e)})
+                response.headers['Retry-After'] = '30'
+                return response, 503
+            except Exception as queue_error:
+                # No worker will pick this upload up; don't leave the row 'parsing' forever
+                try:
+                    supabase_service.update_resume(resume_id, {'status': 'error'})
+                except Exception as e:
+                    print(f"Error marking resume {resume_id} as failed: {str(e)}")
                 return jsonify({
-                    'error': 'Failed to parse resume',
-                    'details': str(parse_error),
+                    'error': 'Failed to queue resume for parsing',
+                    'details': str(queue_error),
                     'resume_id': resume_id
                 }), 500
 
+            return jsonify({
+                'message': 'Resume uploaded, parsing in background',
+                'resume_id': resume_id,
+                'status': 'parsing',
+                'status_url': f'/api/resumes/{resume_id}/status'
+            }), 202
+
         finally:
-            # Clean up temporary file
-            if os.path.exists(file_path):
+            # Clean up the file unless a parse worker owns it now
+            if not queued and os.path.exists(file_path):
                 os.remove(file_path)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@resume_bp.route('/<resume_id>/status', methods=['GET'])
+def get_resume_status(resume_id):
+    """
+    Parsing status of an uploaded resume
+    Status: queued, parsing, parsed or error (with the error message and attempts)
+    """
+    try:
+        job = parse_queue.status(resume_id)
+
+        if not job:
+            # Not uploaded through the queue (or finished long ago): report the row status
+            resume = supabase_service.get_resume(resume_id)
+            if not resume:
+                return jsonify({'error': 'Resume not found'}), 404
+            return jsonify({'resume_id': resume_id, 'status': resume.get('status')}), 200
+
+        return jsonify(job), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@resume_bp.route('/queue', methods=['GET'])
+def get_queue_stats():
+    """Number of parse jobs per status"""
+    try:
+        return jsonify({'jobs': parse_queue.stats(), 'workers': parse_queue.workers}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @resume_bp.route('/', methods=['GET'])
 def get_resumes():
     """
@@ -0,0 +1,176 @@
+"""
+Script to benchmark the installed PDF/DOCX text extractors on a resume corpus
+and record the default extractor per format in data/extractors.json
+
+For every format, each installed extractor reads every file. Speed is the
+median seconds per file; fidelity is how much of the text the other
+extractors agree on it keeps (token-set F1 against the tokens a majority of
+extractors found, averaged over files). The fastest extractor whose fidelity
+reaches --min-fidelity becomes the default that ResumeParser picks up.
+
+Usage:
+    python scripts/calibrate_extractors.py [folder] [--min-fidelity F] [--output PATH] [--dry-run]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.resume_parser import EXTRACTORS, EXTRACTOR_DEFAULTS_PATH
+
+FILE_TYPES = {'.pdf': 'pdf', '.docx': 'docx'}
+
+
+def tokens(text):
+    return set(re.findall(r'\w+', text.lower()))
+
+
+def f1(found, reference):
+    """Token-set F1 of found against reference"""
+    if not found and not reference:
+        return 1.0
+    overlap = len(found & reference)
+    if not overlap:
+        return 0.0
+    precision = overlap / len(found)
+    recall = overlap / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_extractor(extractor, file_path):
+    """(text, seconds), or (None, seconds) if the extractor failed on the file"""
+    start = time.perf_counter()
+    try:
+        text = "\n".join(extractor.iter_chunks(file_path))
+    except Exception as e:
+        print(f"  ✗ {extractor.name} failed on {os.path.basename(file_path)}: {str(e)}")
+        text = None
+    return text, time.perf_counter() - start
+
+
+def calibrate_format(file_type, files, min_fidelity):
+    """
+    Benchmark every installed extractor for one format
+
+    Returns:
+        (default extractor name or None, {name: {'median_seconds', 'total_seconds', 'fidelity', 'failures'}})
+    """
+    extractors = [cls() for cls in EXTRACTORS[file_type] if cls.available()]
+    print(f"\n{file_type.upper()}: {len(files)} files, extractors: {', '.join(e.name for e in extractors) or 'none'}")
+    if not extractors or not files:
+        return None, {}
+
+    timings = {e.name: [] for e in extractors}
+    scores = {e.name: [] for e in extractors}
+    failures = Counter()
+
+    for file_path in files:
+        found = {}
+        for extractor in extractors:
+            text, seconds = run_extractor(extractor, file_path)
+            timings[extractor.name].append(seconds)
+            if text is None:
+                failures[extractor.name] += 1
+            else:
+                found[extractor.name] = tokens(text)
+
+        # Reference text: tokens at least half of the extractors found
+        counts = Counter(token for token_set in found.values() for token in token_set)
+        quorum = len(extractors) / 2
+        reference = {token for token, count in counts.items() if count >= quorum}
+        for extractor in extractors:
+            scores[extractor.name].append(f1(found[extractor.name], reference) if extractor.name in found else 0.0)
+
+    results = {}
+    for extractor in extractors:
+        name = extractor.name
+        results[name] = {
+            'median_seconds': round(statistics.median(timings[name]), 5),
+            'total_seconds': round(sum(timings[name]), 3),
+            'fidelity': round(statistics.mean(scores[name]), 4),
+            'failures': failures[name],
+        }
+        print(f"  {name:<12} median {results[name]['median_seconds'] * 1000:8.1f} ms/file  "
+              f"total {results[name]['total_seconds']:7.2f}s  fidelity {results[name]['fidelity']:.3f}  "
+              f"failures {failures[name]}")
+
+    acceptable = [name for name, result in results.items()
+                  if result['fidelity'] >= min_fidelity and not result['failures']]
+    if not acceptable:
+        print(f"  No extractor reached fidelity {min_fidelity}; keeping the built-in fallback order")
+        return None, results
+    default = min(acceptable, key=lambda name: results[name]['median_seconds'])
+    print(f"  Default: {default}")
+    return default, results
+
+
+def calibrate(folder_path, min_fidelity=0.95, output_path=EXTRACTOR_DEFAULTS_PATH, dry_run=False):
+    """
+    Benchmark extractors on a folder of resumes and record the defaults
+
+    Args:
+        folder_path: Path to folder containing resumes
+        min_fidelity: Lowest acceptable fidelity (0-1) for a default extractor
+        output_path: Where to write the defaults
+        dry_run: Only print the results
+    """
+
+    if not os.path.exists(folder_path):
+        print(f"Error: Folder {folder_path} does not exist")
+        return
+
+    files = {file_type: [] for file_type in EXTRACTORS}
+    for filename in sorted(os.listdir(folder_path)):
+        file_type = FILE_TYPES.get(os.path.splitext(filename)[1].lower())
+        if file_type:
+            files[file_type].append(os.path.join(folder_path, filename))
+
+    defaults = {}
+    results = {}
+    for file_type in EXTRACTORS:
+        default, results[file_type] = calibrate_format(file_type, files[file_type], min_fidelity)
+        if default:
+            defaults[file_type] = default
+
+    if dry_run:
+        return
+
+    report = {
+        'defaults': defaults,
+        'min_fidelity': min_fidelity,
+        'files': {file_type: len(paths) for file_type, paths in files.items()},
+        'calibrated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"\nWrote {output_path}")
+
+
+if __name__ == "__main__":
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description='Benchmark text extractors and record the fastest acceptable one')
+    parser.add_argument('folder', nargs='?', default=os.path.join(project_root, 'resumes'),
+                        help='Folder containing PDF/DOCX resumes (default: <project>/resumes)')
+    parser.add_argument('--min-fidelity', type=float, default=0.95,
+                        help='Lowest acceptable token F1 against the extractors\' consensus (default: 0.95)')
+    parser.add_argument('--output', default=EXTRACTOR_DEFAULTS_PATH,
+                        help='Defaults file read by the resume parser (default: data/extractors.json)')
+    parser.add_argument('--dry-run', action='store_true', help='Print the results without writing them')
+    args = parser.parse_args()
+
+    print("HireSight - Text Extractor Calibration")
+    print("=" * 50)
+    print(f"Resume folder: {args.folder}")
+
+    calibrate(args.folder, args.min_fidelity, args.output, args.dry_run)
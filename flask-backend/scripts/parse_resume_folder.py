@@ -1,27 +1,243 @@
 """
 Script to parse all resumes from the /resumes folder and upload to database
 Run this script to bulk process existing resumes
+
+Reruns are incremental: every file is identified by its content hash, parse
+results are cached under that hash (services/parse_cache.py), and a
+checkpoint journal records which files are already in the database. Files
+whose hash and parser version match the journal are skipped; changed files
+update their existing row instead of inserting a duplicate.
+
+Each parser process takes files in chunks (--chunk-size) so spaCy's
+named-entity model runs over a whole chunk in one nlp.pipe() batch.
+
+Usage:
+    python scripts/parse_resume_folder.py [folder] [--jobs N] [--chunk-size N] [--batch-size N] [--user-id UUID]
+                                          [--checkpoint PATH]
 """
 
 import os
 import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.resume_parser import resume_parser
+from services.resume_parser import resume_parser, NER_BATCH_SIZE
+from services.parse_cache import parse_cache, file_sha256
 from services.supabase_client import supabase_service
 from dotenv import load_dotenv
 
 load_dotenv()
 
+DEFAULT_USER_ID = '00000000-0000-0000-0000-000000000000'
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'cache', 'parse_checkpoint.jsonl')
+
+
+class CheckpointJournal:
+    """
+    Append-only JSON-lines journal of files written to the database
+
+    Each line is {"path", "sha256", "parser_version", "resume_id"}; the last
+    line for a path wins. Lines are appended and flushed after every
+    database write, so a crash loses at most the batch in flight.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry['path']] = entry
+                    except (ValueError, KeyError):
+                        continue  # torn last line after a crash
+
+    def is_done(self, file_path, digest):
+        entry = self.entries.get(file_path)
+        return bool(entry) and entry['sha256'] == digest and entry.get('parser_version') == resume_parser.version
+
+    def resume_id(self, file_path):
+        entry = self.entries.get(file_path)
+        return entry.get('resume_id') if entry else None
+
+    def record(self, items):
+        """Append (file_path, digest, resume_id) entries"""
+        if not items:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for file_path, digest, resume_id in items:
+                entry = {'path': file_path, 'sha256': digest, 'parser_version': resume_parser.version,
+                         'resume_id': resume_id}
+                self.entries[file_path] = entry
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def build_resume_data(filename, file_path, parsed_data, recruiter_user_id=None):
+    """Database row for a parsed resume"""
+    entities = parsed_data['entities']
+    file_type = filename.rsplit('.', 1)[1].lower()
+    return {
+        'user_id': recruiter_user_id or DEFAULT_USER_ID,
+        'file_name': filename,
+        'file_url': f'/resumes/{filename}',
+        'file_type': file_type,
+        'file_size': os.path.getsize(file_path),
+        'status': 'parsed',
+        'skills': entities.get('skills', []),
+        'experience': [str(exp) for exp in entities.get('experience', [])],
+        'education': [str(edu) for edu in entities.get('education', [])],
+        'years_of_experience': entities.get('years_of_experience', 0),
+        'email': entities.get('email'),
+        'phone': entities.get('phone'),
+        'summary': parsed_data.get('cleaned_text', '')[:500] if parsed_data.get('cleaned_text') else None,
+        'parsed_data': {
+            'raw_text': parsed_data.get('raw_text', '')[:1000] if parsed_data.get('raw_text') else None,
+            'entities': entities,
+            'truncated': parsed_data.get('truncated', False)
+        }
+    }
+
 
-def parse_resume_folder(folder_path, recruiter_user_id=None):
+def parse_chunk(tasks, recruiter_user_id=None):
+    """
+    Parse a chunk of (file_path, digest) tasks, loading what it can from the
+    parse cache; runs inside a pool worker (each worker process has its own
+    resume_parser, whose spaCy model loads on the first chunk)
+
+    Returns:
+        List of (file_path, resume_data or None, error message or None, cached)
+    """
+    files = [(file_path, os.path.basename(file_path).rsplit('.', 1)[-1].lower(), digest)
+             for file_path, digest in tasks]
+    try:
+        parsed = parse_cache.parse_batch(resume_parser, files)
+    except Exception as e:
+        return [(file_path, None, str(e), False) for file_path, _ in tasks]
+
+    results = []
+    for (file_path, _, _), (parsed_data, cached, error) in zip(files, parsed):
+        if error:
+            results.append((file_path, None, error, False))
+            continue
+        try:
+            resume_data = build_resume_data(os.path.basename(file_path), file_path, parsed_data, recruiter_user_id)
+            results.append((file_path, resume_data, None, cached))
+        except Exception as e:
+            results.append((file_path, None, str(e), False))
+    return results
+
+
+def parse_files(tasks, jobs, recruiter_user_id=None, chunk_size=NER_BATCH_SIZE):
+    """
+    Yield parse results for (file_path, digest) tasks, chunk by chunk in completion order
+
+    With jobs > 1 chunks are parsed in a process pool. If a worker process
+    dies, the chunks it left unfinished are retried once in a fresh pool.
+    """
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    if jobs <= 1:
+        for chunk in chunks:
+            yield from parse_chunk(chunk, recruiter_user_id)
+        return
+
+    remaining = chunks
+    for attempt in range(2):
+        crashed = []
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(parse_chunk, chunk, recruiter_user_id): chunk for chunk in remaining}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    yield from future.result()
+                except BrokenProcessPool:
+                    crashed.append(chunk)
+                except Exception as e:
+                    for path, _ in chunk:
+                        yield path, None, str(e), False
+        if not crashed:
+            return
+        files = sum(len(chunk) for chunk in crashed)
+        print(f"  ! A worker process crashed; {'retrying' if attempt == 0 else 'giving up on'} {files} files")
+        remaining = crashed
+    for chunk in remaining:
+        for path, _ in chunk:
+            yield path, None, 'Worker process crashed', False
+
+
+def write_batch(batch, journal):
+    """
+    Write parsed rows and journal them. New files are bulk inserted; if the
+    bulk request fails, rows are inserted one by one so one bad row does not
+    lose the others. Files already in the journal update their existing row.
+
+    Args:
+        batch: List of (file_path, digest, resume_data, existing resume_id or None)
+
+    Returns:
+        Number of rows written
+    """
+    done = []
+    new = [item for item in batch if not item[3]]
+    for file_path, digest, row, resume_id in batch:
+        if not resume_id:
+            continue
+        try:
+            if supabase_service.update_resume(resume_id, row):
+                done.append((file_path, digest, resume_id))
+            else:
+                print(f"  ✗ Resume {resume_id} for {row['file_name']} no longer exists, inserting it again")
+                new.append((file_path, digest, row, None))
+        except Exception as e:
+            print(f"  ✗ Failed to update {row['file_name']}: {str(e)}")
+
+    inserted = None
+    if new:
+        try:
+            inserted = supabase_service.insert_resumes([row for _, _, row, _ in new])
+        except Exception as e:
+            print(f"  ! Bulk insert of {len(new)} rows failed ({str(e)}), inserting one by one")
+    if inserted is not None:
+        # PostgREST returns inserted rows in request order; if it returned none
+        # (e.g. hidden by row-level security) the rows are still in, just without known ids
+        ids = [record.get('id') for record in inserted] if len(inserted) == len(new) else [None] * len(new)
+        done.extend((path, digest, resume_id) for (path, digest, _, _), resume_id in zip(new, ids))
+    elif new:
+        for file_path, digest, row, _ in new:
+            try:
+                record = supabase_service.insert_resume(row)
+                if record:
+                    done.append((file_path, digest, record.get('id')))
+                else:
+                    print(f"  ✗ Failed to insert {row['file_name']} into database")
+            except Exception as e:
+                print(f"  ✗ Failed to insert {row['file_name']}: {str(e)}")
+
+    journal.record(done)
+    return len(done)
+
+
+def parse_resume_folder(folder_path, recruiter_user_id=None, jobs=1, batch_size=50, checkpoint_path=None,
+                        chunk_size=NER_BATCH_SIZE):
     """
     Parse all resumes from a folder and upload to database
 
     Args:
         folder_path: Path to folder containing resumes
         recruiter_user_id: User ID who uploaded these resumes (optional)
+        jobs: Number of parser processes
+        batch_size: Rows per bulk insert
+        checkpoint_path: Checkpoint journal file (default: cache/parse_checkpoint.jsonl)
+        chunk_size: Files a parser process takes at a time (one NER batch)
     """
 
     if not os.path.exists(folder_path):
@@ -29,78 +245,95 @@ def parse_resume_folder(folder_path, recruiter_user_id=None):
         return
 
     files = [f for f in os.listdir(folder_path) if f.lower().endswith(('.pdf', '.docx', '.doc'))]
+    journal = CheckpointJournal(checkpoint_path or DEFAULT_CHECKPOINT)
 
-    print(f"Found {len(files)} resume files to process")
+    # Hashing is cheap next to parsing; it decides what is left to do
+    tasks = []
+    skipped = 0
+    failed = 0
+    for filename in files:
+        file_path = os.path.abspath(os.path.join(folder_path, filename))
+        try:
+            digest = file_sha256(file_path)
+        except OSError as e:
+            failed += 1
+            print(f"  ✗ Cannot read {filename}: {str(e)}")
+            continue
+        if journal.is_done(file_path, digest):
+            skipped += 1
+        else:
+            tasks.append((file_path, digest))
+
+    print(f"Found {len(files)} resume files, {skipped} already done, "
+          f"{len(tasks)} to process ({jobs} parser process{'es' if jobs > 1 else ''})")
     print("-" * 50)
 
     successful = 0
-    failed = 0
+    cache_hits = 0
+    processed = 0
+    batch = []
+    start = time.time()
 
-    for filename in files:
-        try:
-            print(f"\nProcessing: {filename}")
-
-            file_path = os.path.join(folder_path, filename)
-            file_type = filename.rsplit('.', 1)[1].lower()
-
-            parsed_data = resume_parser.parse_resume(file_path, file_type)
-
-            entities = parsed_data['entities']
-
-            print(f"  ✓ Extracted {len(entities.get('skills', []))} skills")
-            print(f"  ✓ Found {entities.get('years_of_experience', 0)} years of experience")
-
-            resume_data = {
-                'user_id': recruiter_user_id or '00000000-0000-0000-0000-000000000000',
-                'file_name': filename,
-                'file_url': f'/resumes/{filename}',
-                'file_type': file_type,
-                'file_size': os.path.getsize(file_path),
-                'status': 'parsed',
-                'skills': entities.get('skills', []),
-                'experience': [str(exp) for exp in entities.get('experience', [])],
-                'education': [str(edu) for edu in entities.get('education', [])],
-                'years_of_experience': entities.get('years_of_experience', 0),
-                'email': entities.get('email'),
-                'phone': entities.get('phone'),
-                'summary': parsed_data.get('cleaned_text', '')[:500] if parsed_data.get('cleaned_text') else None,
-                'parsed_data': {
-                    'raw_text': parsed_data.get('raw_text', '')[:1000] if parsed_data.get('raw_text') else None,
-                    'entities': entities
-                }
-            }
-
-            # Insert into database
-            result = supabase_service.insert_resume(resume_data)
-
-            if result:
-                successful += 1
-                print(f"  ✓ Successfully parsed and inserted into database")
-                print(f"    Resume ID: {result.get('id', 'N/A')}")
-                print(f"    Skills: {', '.join(entities.get('skills', [])[:5])}...")
-            else:
-                failed += 1
-                print(f"  ✗ Failed to insert into database")
+    def flush():
+        nonlocal successful, failed, batch
+        written = write_batch(batch, journal)
+        successful += written
+        failed += len(batch) - written
+        batch = []
 
-        except Exception as e:
+    digests = dict(tasks)
+    for file_path, resume_data, error, cached in parse_files(tasks, jobs, recruiter_user_id, chunk_size):
+        processed += 1
+        filename = os.path.basename(file_path)
+        if error:
             failed += 1
-            print(f"  ✗ Error parsing {filename}: {str(e)}")
+            print(f"  ✗ Error parsing {filename}: {error}")
+        else:
+            cache_hits += int(cached)
+            batch.append((file_path, digests[file_path], resume_data, journal.resume_id(file_path)))
+            print(f"  ✓ {filename}: {len(resume_data['skills'])} skills, "
+                  f"{resume_data['years_of_experience']} years of experience{' (cached)' if cached else ''}")
+            if len(batch) >= batch_size:
+                flush()
+
+        if processed % batch_size == 0 or processed == len(tasks):
+            elapsed = time.time() - start
+            rate = processed / elapsed if elapsed > 0 else 0.0
+            eta = (len(tasks) - processed) / rate if rate > 0 else 0.0
+            print(f"Progress: {processed}/{len(tasks)} files, {rate:.1f} files/sec, ETA {eta:.0f}s")
+
+    flush()
+    elapsed = time.time() - start
 
     print("\n" + "=" * 50)
     print(f"SUMMARY:")
-    print(f"  Successfully parsed: {successful}")
+    print(f"  Successfully parsed: {successful} ({cache_hits} from parse cache)")
+    print(f"  Skipped (unchanged): {skipped}")
     print(f"  Failed: {failed}")
     print(f"  Total: {len(files)}")
+    print(f"  Time: {elapsed:.1f}s ({len(tasks) / elapsed if elapsed > 0 else 0.0:.1f} files/sec)")
     print("=" * 50)
 
 
 if __name__ == "__main__":
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    resumes_folder = os.path.join(project_root, 'resumes')
+
+    parser = argparse.ArgumentParser(description='Parse a folder of resumes and upload them to the database')
+    parser.add_argument('folder', nargs='?', default=os.path.join(project_root, 'resumes'),
+                        help='Folder containing PDF/DOCX resumes (default: <project>/resumes)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Parser processes to run in parallel (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=NER_BATCH_SIZE,
+                        help=f'Files per parser task; named entities are extracted per chunk (default: {NER_BATCH_SIZE})')
+    parser.add_argument('--batch-size', type=int, default=50, help='Rows per bulk database insert (default: 50)')
+    parser.add_argument('--user-id', default=None, help='User ID to record as the uploader')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                        help='Checkpoint journal; delete it to re-insert everything (default: cache/parse_checkpoint.jsonl)')
+    args = parser.parse_args()
 
     print("HireSight - Resume Parser")
     print("=" * 50)
-    print(f"Resume folder: {resumes_folder}")
+    print(f"Resume folder: {args.folder}")
     print()
 
-    parse_resume_folder(resumes_folder)
+    parse_resume_folder(args.folder, args.user_id, jobs=max(1, args.jobs), batch_size=max(1, args.batch_size),
+                        checkpoint_path=args.checkpoint, chunk_size=max(1, args.chunk_size))
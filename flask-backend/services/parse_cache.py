@@ -0,0 +1,110 @@
+"""
+Parse Cache Service
+Caches parse results on disk by file content hash and parser version
+"""
+
+import os
+import json
+import hashlib
+
+from services.resume_parser import PARSER_VERSION
+
+DEFAULT_CACHE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'parsed')
+
+
+def file_sha256(file_path):
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Parse results stored as <folder>/<sha[:2]>/<sha>.json
+
+    An entry is only used if it was written by the same parser version
+    (PARSER_VERSION plus the text extractors in use), so bumping the version
+    or switching extractors re-parses every file once. Writes go through a
+    temporary file and a rename, so concurrent parser processes never see a
+    half-written entry.
+    """
+
+    def __init__(self, folder=None, parser_version=PARSER_VERSION):
+        self.folder = folder or DEFAULT_CACHE_FOLDER
+        self.parser_version = parser_version
+
+    def _path(self, digest):
+        return os.path.join(self.folder, digest[:2], f"{digest}.json")
+
+    def get(self, digest, version=None):
+        """Cached parse result for a content hash, or None"""
+        try:
+            with open(self._path(digest), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('parser_version') != (version or self.parser_version):
+            return None
+        return entry.get('result')
+
+    def put(self, digest, result, version=None):
+        """Store a parse result under its content hash"""
+        path = self._path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp-{os.getpid()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'parser_version': version or self.parser_version, 'result': result}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # The cache is an optimization; a failed write only costs a re-parse later
+            print(f"Warning: could not write parse cache entry: {str(e)}")
+
+    def parse(self, parser, file_path, file_type, digest=None):
+        """
+        Parse a resume, reusing the cached result for identical file contents
+
+        Returns:
+            (parsed_data, digest, cached)
+        """
+        digest = digest or file_sha256(file_path)
+        parsed_data = self.get(digest, parser.version)
+        if parsed_data is not None:
+            return parsed_data, digest, True
+        parsed_data = parser.parse_resume(file_path, file_type)
+        self.put(digest, parsed_data, parser.version)
+        return parsed_data, digest, False
+
+    def parse_batch(self, parser, files):
+        """
+        Parse many resumes, reusing cached results; the rest are parsed
+        together so named-entity extraction runs as one batch
+
+        Args:
+            files: List of (file_path, file_type, digest)
+
+        Returns:
+            List of (parsed_data or None, cached, error message or None), in input order
+        """
+        results = [None] * len(files)
+        misses = []
+        for i, (file_path, file_type, digest) in enumerate(files):
+            parsed_data = self.get(digest, parser.version)
+            if parsed_data is not None:
+                results[i] = (parsed_data, True, None)
+            else:
+                misses.append(i)
+
+        parsed = parser.parse_resumes_batch([files[i][:2] for i in misses]) if misses else []
+        for i, (parsed_data, error) in zip(misses, parsed):
+            if parsed_data is not None:
+                self.put(files[i][2], parsed_data, parser.version)
+            results[i] = (parsed_data, False, error)
+        return results
+
+
+# Global cache instance
+parse_cache = ParseCache(os.environ.get('PARSE_CACHE_FOLDER'))
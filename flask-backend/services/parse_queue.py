@@ -0,0 +1,313 @@
+"""
+Parse Queue Service
+Durable SQLite-backed queue of uploaded resumes, parsed by a bounded pool of background workers
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+from services.resume_parser import resume_parser
+from services.parse_cache import parse_cache
+from services.supabase_client import supabase_service
+
+DEFAULT_QUEUE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'parse_queue.db')
+
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', '2'))
+# Uploads waiting to be parsed before new ones are refused (0 for no limit)
+MAX_PENDING = int(os.environ.get('PARSE_QUEUE_MAX_PENDING', '1000'))
+MAX_ATTEMPTS = int(os.environ.get('PARSE_MAX_ATTEMPTS', '3'))
+# Seconds before a failed job is retried, doubled after every further failure
+RETRY_DELAY = float(os.environ.get('PARSE_RETRY_DELAY', '30'))
+# Failures that would repeat on every attempt (unsupported file, no text, no extractor)
+PERMANENT_ERRORS = (ValueError, ImportError)
+# Finished jobs are kept this long for the status endpoint
+JOB_RETENTION = float(os.environ.get('PARSE_JOB_RETENTION', str(7 * 24 * 3600)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    resume_id TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    file_name TEXT,
+    file_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    error TEXT,
+    cached INTEGER,
+    queued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, queued_at);
+"""
+
+JOB_FIELDS = ['resume_id', 'file_name', 'file_type', 'status', 'attempts', 'error', 'cached',
+              'queued_at', 'started_at', 'finished_at']
+
+
+class QueueFull(Exception):
+    """Raised when too many uploads are already waiting to be parsed"""
+
+
+def build_parsed_update(parsed_data):
+    """Resume row fields for a parse result"""
+    entities = parsed_data['entities']
+    return {
+        'status': 'parsed',
+        'skills': entities.get('skills', []),
+        'experience': [str(exp) for exp in entities.get('experience', [])],
+        'education': [str(edu) for edu in entities.get('education', [])],
+        'years_of_experience': entities.get('years_of_experience', 0),
+        'email': entities.get('email'),
+        'phone': entities.get('phone'),
+        'summary': parsed_data['cleaned_text'][:500],
+        'parsed_data': {
+            'raw_text': parsed_data['raw_text'][:1000],
+            'entities': entities,
+            'truncated': parsed_data.get('truncated', False)
+        }
+    }
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ParseQueue:
+    """
+    Resume parse jobs stored in SQLite and worked off by background threads
+
+    A job is one uploaded file waiting to be parsed into its resume row:
+    queued -> parsing -> parsed | error. The queue survives restarts: jobs
+    still queued are picked up again, and jobs left 'parsing' by a process
+    that no longer exists are re-queued. Jobs are claimed inside an
+    IMMEDIATE transaction, so several server processes can share one queue
+    file without parsing a job twice. Failed parses are retried up to
+    MAX_ATTEMPTS times, with an exponential backoff: a failed job is
+    re-stamped to the back of the queue with a queued_at in the future,
+    and only jobs whose queued_at has passed are claimed.
+    """
+
+    def __init__(self, path=None, workers=PARSE_WORKERS, max_pending=MAX_PENDING):
+        self.path = path or DEFAULT_QUEUE_PATH
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._started = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def start(self):
+        """Recover interrupted jobs and start the worker threads (once per process)"""
+        with self._wakeup:
+            if self._started:
+                return
+            self._started = True
+        self.recover()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'parse-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def recover(self):
+        """Re-queue jobs whose worker process died; drop old finished jobs"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute("SELECT resume_id, worker_pid FROM jobs WHERE status = 'parsing'").fetchall()
+            # Runs before this process starts its workers, so a job held by our own pid is
+            # left over from an earlier process that had the same pid (e.g. pid 1 in a container)
+            orphaned = [row['resume_id'] for row in rows
+                        if row['worker_pid'] in (None, os.getpid()) or not pid_alive(row['worker_pid'])]
+            conn.executemany("UPDATE jobs SET status = 'queued', worker_pid = NULL WHERE resume_id = ?",
+                             [(resume_id,) for resume_id in orphaned])
+            conn.execute("DELETE FROM jobs WHERE status IN ('parsed', 'error') AND finished_at < ?",
+                         (time.time() - JOB_RETENTION,))
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+        if orphaned:
+            print(f"Parse queue: re-queued {len(orphaned)} interrupted jobs")
+
+    def enqueue(self, resume_id, file_path, file_name, file_type):
+        """
+        Queue an uploaded file for parsing
+
+        Raises:
+            QueueFull: if max_pending jobs are already waiting
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            if self.max_pending:
+                pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+                if pending >= self.max_pending:
+                    conn.execute('ROLLBACK')
+                    raise QueueFull(f"{pending} resumes are already waiting to be parsed")
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (resume_id, file_path, file_name, file_type, status, queued_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (resume_id, file_path, file_name, file_type, time.time())
+            )
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def status(self, resume_id):
+        """Job status dict (with queue position while queued), or None for unknown ids"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE resume_id = ?', (resume_id,)).fetchone()
+            if row is None:
+                return None
+            job = {field: row[field] for field in JOB_FIELDS}
+            job['cached'] = None if row['cached'] is None else bool(row['cached'])
+            if row['status'] == 'queued':
+                job['position'] = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND queued_at < ?", (row['queued_at'],)
+                ).fetchone()[0] + 1
+            return job
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Number of jobs per status"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT status, COUNT(*) AS count FROM jobs GROUP BY status').fetchall()
+            return {row['status']: row['count'] for row in rows}
+        finally:
+            conn.close()
+
+    def _claim(self):
+        """Mark the oldest due queued job as parsing and return it, or None"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' AND queued_at <= ? ORDER BY queued_at LIMIT 1",
+                (time.time(),)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'parsing', attempts = attempts + 1, worker_pid = ?, started_at = ? "
+                    "WHERE resume_id = ?",
+                    (os.getpid(), time.time(), row['resume_id'])
+                )
+            conn.execute('COMMIT')
+            return row
+        finally:
+            conn.close()
+
+    def _finish(self, resume_id, status, error=None, cached=None):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, cached = ?, worker_pid = NULL, finished_at = ? "
+                "WHERE resume_id = ?",
+                (status, error, cached, time.time() if status in ('parsed', 'error') else None, resume_id)
+            )
+        finally:
+            conn.close()
+
+    def _retry(self, job, error):
+        """Re-queue a failed job behind newer uploads, claimable once its backoff has passed"""
+        delay = RETRY_DELAY * 2 ** job['attempts']
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, worker_pid = NULL, queued_at = ? "
+                "WHERE resume_id = ?",
+                (error, time.time() + delay, job['resume_id'])
+            )
+        finally:
+            conn.close()
+
+    def _work(self):
+        while True:
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"Parse queue: could not claim a job: {str(e)}")
+                job = None
+            if job is None:
+                # Other processes may queue jobs too, so poll as well as wait for a notify
+                with self._wakeup:
+                    self._wakeup.wait(timeout=5)
+                continue
+            try:
+                self._run(job)
+            except Exception as e:
+                # Usually the queue database (e.g. locked past the timeout); keep the worker alive
+                print(f"Parse queue: worker error on resume {job['resume_id']}: {str(e)}")
+                try:
+                    if job['attempts'] + 1 < MAX_ATTEMPTS:
+                        self._retry(job, str(e))
+                    else:
+                        self._finish(job['resume_id'], 'error', error=str(e))
+                except Exception as e:
+                    print(f"Parse queue: could not record job {job['resume_id']} ({str(e)}); "
+                          f"it is re-queued on the next restart")
+                time.sleep(1)
+
+    def _run(self, job):
+        """Parse one job's file into its resume row"""
+        resume_id = job['resume_id']
+        file_path = job['file_path']
+        try:
+            parsed_data, _, cached = parse_cache.parse(resume_parser, file_path, job['file_type'])
+            updated = supabase_service.update_resume(resume_id, build_parsed_update(parsed_data))
+        except Exception as e:
+            print(f"Error parsing queued resume {resume_id} (attempt {job['attempts'] + 1}): {str(e)}")
+            retryable = not isinstance(e, PERMANENT_ERRORS) and os.path.exists(file_path)
+            if retryable and job['attempts'] + 1 < MAX_ATTEMPTS:
+                self._retry(job, str(e))
+                return
+            self._finish(resume_id, 'error', error=str(e))
+            try:
+                supabase_service.update_resume(resume_id, {'status': 'error'})
+            except Exception:
+                pass
+        else:
+            if updated:
+                self._finish(resume_id, 'parsed', cached=int(cached))
+            else:
+                # The row was deleted while the job waited; there is nothing to retry
+                print(f"Queued resume {resume_id} no longer exists, dropping its parse result")
+                self._finish(resume_id, 'error', error='Resume no longer exists')
+
+        # Parsed, or failed for good: the uploaded file is no longer needed
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Parse queue: could not remove {file_path}: {str(e)}")
+
+
+# Global queue instance; workers start when the resume routes are registered
+parse_queue = ParseQueue(os.environ.get('PARSE_QUEUE_PATH'))
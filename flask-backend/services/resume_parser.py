@@ -5,178 +5,410 @@ Extracts information from PDF and DOCX resumes using NLP
 
 import re
 import os
-from PyPDF2 import PdfReader
-from docx import Document
-import spacy
+import json
+import time
+import zipfile
+import threading
+import importlib.util
+from xml.etree import ElementTree
 from collections import Counter
+from services.skill_matcher import SkillMatcher, DEFAULT_TAXONOMY_PATH
+from services.section_segmenter import SegmentedText
+
+# Bump whenever extraction output changes, so cached parse results are recomputed
+PARSER_VERSION = 4
+
+# Extraction budgets; a file that hits one is parsed from the text read so far
+# and flagged as truncated (0 disables a budget)
+MAX_PAGES = int(os.environ.get('PARSE_MAX_PAGES', '30'))
+MAX_CHARS = int(os.environ.get('PARSE_MAX_CHARS', '200000'))
+TIME_BUDGET = float(os.environ.get('PARSE_TIME_BUDGET', '20'))
+
+# spaCy model for named entities; every pipe of the model not listed in SPACY_KEEP_PIPES is
+# excluded at load time. The en_core_web_sm/md/lg NER has its own token-to-vector layer;
+# transformer models share one, so keep it too (SPACY_KEEP_PIPES=transformer,ner)
+SPACY_MODEL = os.environ.get('SPACY_MODEL', 'en_core_web_sm')
+SPACY_KEEP_PIPES = [name.strip() for name in os.environ.get('SPACY_KEEP_PIPES', 'ner').split(',') if name.strip()]
+# Documents per nlp.pipe() batch, and text per document sent to NER
+NER_BATCH_SIZE = int(os.environ.get('NER_BATCH_SIZE', '16'))
+NER_MAX_CHARS = int(os.environ.get('NER_MAX_CHARS', '20000'))
+# spaCy entity labels -> entity keys in the parse result
+NER_LABELS = {'PERSON': 'names', 'ORG': 'organizations', 'DATE': 'dates'}
+NER_MAX_ENTITIES = 10
+
+# Per-format extractor defaults written by scripts/calibrate_extractors.py
+EXTRACTOR_DEFAULTS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'extractors.json')
+
+
+class TextExtractor:
+    """
+    Text extraction backend for one file format
+
+    Subclasses yield a file's text in chunks (pages for PDF, paragraphs for
+    DOCX) so callers can stop early. Libraries are imported on first use;
+    available() tells whether the backend's package is installed.
+    """
+
+    name = None
+    file_type = None
+    module = None
+
+    @classmethod
+    def available(cls):
+        return cls.module is None or importlib.util.find_spec(cls.module) is not None
+
+    def iter_chunks(self, file_path):
+        raise NotImplementedError
+
+    def open_chunks(self, file_path):
+        """
+        (number of chunks, or None when it is unknown without extracting them,
+        iterator of chunk texts)
+        """
+        return None, self.iter_chunks(file_path)
 
 
-class ResumeParser:
-    """Resume parsing and entity extraction"""
+class PyPDF2Extractor(TextExtractor):
+    name = 'pypdf2'
+    file_type = 'pdf'
+    module = 'PyPDF2'
 
-    def __init__(self):
-        """Initialize NLP models"""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except:
-            print("Warning: spaCy model not loaded. Run: python -m spacy download en_core_web_sm")
-            self.nlp = None
+    def open_chunks(self, file_path):
+        from PyPDF2 import PdfReader
+        pages = PdfReader(file_path).pages
+        return len(pages), ((page.extract_text() or "") for page in pages)
 
-        # Common skills database (expand this list)
-        self.SKILLS_DB = [
-            # Programming Languages
-            'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
-            'go', 'rust', 'scala', 'r', 'matlab', 'perl', 'shell', 'bash', 'powershell',
+    def iter_chunks(self, file_path):
+        return self.open_chunks(file_path)[1]
 
-            # Web Technologies
-            'html', 'css', 'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask',
-            'spring', 'asp.net', 'jquery', 'bootstrap', 'tailwind', 'sass', 'webpack', 'vite',
 
-            # Databases
-            'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'cassandra',
-            'oracle', 'sqlite', 'dynamodb', 'firebase', 'supabase',
+class PypdfExtractor(TextExtractor):
+    name = 'pypdf'
+    file_type = 'pdf'
+    module = 'pypdf'
 
-            # Cloud & DevOps
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'ci/cd', 'terraform',
-            'ansible', 'git', 'github', 'gitlab', 'bitbucket', 'linux', 'nginx', 'apache',
+    def open_chunks(self, file_path):
+        from pypdf import PdfReader
+        pages = PdfReader(file_path).pages
+        return len(pages), ((page.extract_text() or "") for page in pages)
+
+    def iter_chunks(self, file_path):
+        return self.open_chunks(file_path)[1]
 
-            # Data Science & ML
-            'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'keras', 'scikit-learn',
-            'pandas', 'numpy', 'data analysis', 'data science', 'nlp', 'computer vision', 'ai',
 
-            # Mobile Development
-            'ios', 'android', 'react native', 'flutter', 'xamarin', 'swift', 'objective-c',
+class PyMuPDFExtractor(TextExtractor):
+    name = 'pymupdf'
+    file_type = 'pdf'
+    module = 'fitz'
+
+    def open_chunks(self, file_path):
+        import fitz
+        doc = fitz.open(file_path)
+
+        def pages():
+            with doc:
+                for page in doc:
+                    yield page.get_text()
+        return len(doc), pages()
+
+    def iter_chunks(self, file_path):
+        return self.open_chunks(file_path)[1]
+
+
+class PdfminerExtractor(TextExtractor):
+    name = 'pdfminer'
+    file_type = 'pdf'
+    module = 'pdfminer'
+
+    def iter_chunks(self, file_path):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        for layout in extract_pages(file_path):
+            yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+
+class PythonDocxExtractor(TextExtractor):
+    name = 'python-docx'
+    file_type = 'docx'
+    module = 'docx'
+
+    def iter_chunks(self, file_path):
+        from docx import Document
+        for paragraph in Document(file_path).paragraphs:
+            yield paragraph.text
+
+
+class DocxXmlExtractor(TextExtractor):
+    """Reads word/document.xml straight from the zip (no dependencies; includes table text)"""
+
+    name = 'docx-xml'
+    file_type = 'docx'
+    module = None
+
+    W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+    def iter_chunks(self, file_path):
+        with zipfile.ZipFile(file_path) as archive:
+            root = ElementTree.fromstring(archive.read('word/document.xml'))
+        text_tag, tab_tag = self.W + 't', self.W + 'tab'
+        for paragraph in root.iter(self.W + 'p'):
+            yield "".join(
+                (node.text or "") if node.tag == text_tag else ("\t" if node.tag == tab_tag else "")
+                for node in paragraph.iter()
+            )
+
+
+# Backends per format, in fallback order (the first ones match the original parser)
+EXTRACTORS = {
+    'pdf': [PyPDF2Extractor, PypdfExtractor, PyMuPDFExtractor, PdfminerExtractor],
+    'docx': [PythonDocxExtractor, DocxXmlExtractor],
+}
+
+
+def load_extractor_defaults(path=EXTRACTOR_DEFAULTS_PATH):
+    """Calibrated {format: extractor name} defaults, or {} if never calibrated"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('defaults', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def select_extractor(file_type, name=None):
+    """
+    Extractor for a format: the requested name, else the calibrated default,
+    else the first installed backend
+    """
+    candidates = EXTRACTORS[file_type]
+    by_name = {cls.name: cls for cls in candidates}
+    for wanted in (name, load_extractor_defaults().get(file_type)):
+        if not wanted:
+            continue
+        cls = by_name.get(wanted)
+        if cls is not None and cls.available():
+            return cls()
+        print(f"Warning: {file_type} extractor '{wanted}' is not available")
+    for cls in candidates:
+        if cls.available():
+            return cls()
+    raise ImportError(f"No {file_type} text extractor installed")
+
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Matches various phone formats
+PHONE_PATTERNS = [
+    re.compile(r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),
+    re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'),
+]
+# Common job titles and fields
+JOB_PATTERN = re.compile(
+    r'Developer|Engineer|Manager|Designer|Analyst|Scientist|Consultant|Architect|'
+    r'Software|Data|Systems|Network|Database|Frontend|Backend|Full Stack|DevOps',
+    re.IGNORECASE
+)
+EXPERIENCE_INDICATORS = ['experience', 'employment', 'work history', 'professional']
+DEGREE_PATTERN = re.compile('|'.join(re.escape(degree) for degree in [
+    'bachelor', 'master', 'phd', 'doctorate', 'mba', 'bs', 'ba', 'ms', 'ma',
+    'b.tech', 'm.tech', 'b.e', 'm.e', 'bsc', 'msc', 'associate', 'diploma'
+]))
+YEARS_PATTERN = re.compile(
+    r'(\d+)\+?\s*years?\s+(?:of\s+)?experience|experience:\s*(\d+)\+?\s*years?|(\d+)\+?\s*years?\s+(?:in|as|with)',
+    re.IGNORECASE
+)
+DATE_RANGE_PATTERN = re.compile(r'(20\d{2})\s*[-–]\s*(?:(20\d{2})|present|current)', re.IGNORECASE)
 
-            # Other Technologies
-            'rest api', 'graphql', 'microservices', 'agile', 'scrum', 'jira', 'confluence',
-            'testing', 'unit testing', 'integration testing', 'selenium', 'jest', 'pytest',
-        ]
+
+class ResumeParser:
+    """Resume parsing and entity extraction"""
+
+    def __init__(self, max_pages=MAX_PAGES, max_chars=MAX_CHARS, time_budget=TIME_BUDGET):
+        """Initialize extractors and the skills taxonomy; the spaCy model loads on first use"""
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.time_budget = time_budget
+        self.extractors = {
+            'pdf': select_extractor('pdf', os.environ.get('PDF_EXTRACTOR')),
+            'docx': select_extractor('docx', os.environ.get('DOCX_EXTRACTOR')),
+        }
+
+        self._nlp = None
+        self._nlp_loaded = False
+        self._nlp_lock = threading.Lock()
+
+        # Skills taxonomy (canonical names + aliases), compiled once
+        taxonomy_path = os.environ.get('SKILLS_TAXONOMY_PATH') or DEFAULT_TAXONOMY_PATH
+        self.skill_matcher = SkillMatcher.from_file(taxonomy_path)
+
+    @property
+    def nlp(self):
+        """spaCy pipeline trimmed to NER, loaded on first access (None if unavailable)"""
+        if not self._nlp_loaded:
+            with self._nlp_lock:
+                if not self._nlp_loaded:
+                    try:
+                        import spacy
+                        # Pipe names come from the model's meta.json, read without loading any weights
+                        meta = spacy.info(SPACY_MODEL, silent=True)
+                        pipes = meta.get('components') or meta.get('pipeline') or []
+                        exclude = [name for name in pipes if name not in SPACY_KEEP_PIPES]
+                        self._nlp = spacy.load(SPACY_MODEL, exclude=exclude)
+                    except Exception:
+                        print(f"Warning: spaCy model not loaded. Run: python -m spacy download {SPACY_MODEL}")
+                        self._nlp = None
+                    self._nlp_loaded = True
+        return self._nlp
+
+    @property
+    def version(self):
+        """Parser version plus the extractors in use; keys cached parse results"""
+        return f"{PARSER_VERSION}:{self.extractors['pdf'].name}:{self.extractors['docx'].name}"
+
+    def iter_pdf_pages(self, file_path):
+        """Yield the text of each PDF page, one page at a time"""
+        return self.extractors['pdf'].iter_chunks(file_path)
+
+    def join_within_budget(self, chunks, max_units=None, total_units=None):
+        """
+        Join text chunks until a budget is hit
+
+        Args:
+            chunks: Iterable of text chunks (pages or paragraphs), extracted lazily
+            max_units: Maximum number of chunks to read (None for no limit)
+            total_units: Number of chunks in the file, if known; decides whether
+                stopping at max_units truncated anything
+
+        Returns:
+            (text, truncated)
+        """
+        parts = []
+        chars = 0
+        truncated = False
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        for chunk in chunks:
+            # chars is the length of the joined text so far, newlines included
+            separator = 1 if parts else 0
+            if self.max_chars and chars + separator + len(chunk) > self.max_chars:
+                remaining = self.max_chars - chars - separator
+                if remaining > 0:
+                    parts.append(chunk[:remaining])
+                truncated = True
+                break
+            parts.append(chunk)
+            chars += separator + len(chunk)
+            if max_units and len(parts) >= max_units:
+                # Stop without pulling (and so extracting) another chunk
+                truncated = total_units is None or total_units > max_units
+                break
+            # Checked between chunks; a single slow page still runs to completion
+            if deadline and time.monotonic() > deadline:
+                truncated = True
+                break
+        return "\n".join(parts).strip(), truncated
 
     def extract_text_from_pdf(self, file_path):
-        """Extract text from PDF file"""
+        """
+        Extract text from PDF file, page by page within the page, character
+        and time budgets
+
+        Returns:
+            (text, truncated)
+        """
         try:
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            total, pages = self.extractors['pdf'].open_chunks(file_path)
+            return self.join_within_budget(pages, max_units=self.max_pages, total_units=total)
         except Exception as e:
             print(f"Error extracting PDF text: {str(e)}")
             raise
 
     def extract_text_from_docx(self, file_path):
-        """Extract text from DOCX file"""
+        """
+        Extract text from DOCX file within the character and time budgets
+
+        Returns:
+            (text, truncated)
+        """
         try:
-            doc = Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text.strip()
+            return self.join_within_budget(self.extractors['docx'].iter_chunks(file_path))
         except Exception as e:
             print(f"Error extracting DOCX text: {str(e)}")
             raise
 
-    def extract_email(self, text):
-        """Extract email address from text"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        return emails[0] if emails else None
-
-    def extract_phone(self, text):
-        """Extract phone number from text"""
-        # Matches various phone formats
-        phone_patterns = [
-            r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-            r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-        ]
-        for pattern in phone_patterns:
-            phones = re.findall(pattern, text)
-            if phones:
-                return phones[0]
+    def extract_email(self, text, sections=None):
+        """Extract email address, looking in the contact section first"""
+        sections = sections or SegmentedText(text)
+        match = EMAIL_PATTERN.search(sections.text_of('contact')) or EMAIL_PATTERN.search(text)
+        return match.group(0) if match else None
+
+    def extract_phone(self, text, sections=None):
+        """Extract phone number, looking in the contact section first"""
+        sections = sections or SegmentedText(text)
+        for scope in (sections.text_of('contact'), text):
+            for pattern in PHONE_PATTERNS:
+                match = pattern.search(scope)
+                if match:
+                    return match.group(0)
         return None
 
     def extract_skills(self, text):
         """Extract skills from text"""
-        text_lower = text.lower()
-        found_skills = []
-
-        for skill in self.SKILLS_DB:
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text_lower):
-                # Capitalize properly
-                found_skills.append(skill.title())
-
-        # Remove duplicates while preserving order
-        unique_skills = []
-        seen = set()
-        for skill in found_skills:
-            if skill.lower() not in seen:
-                unique_skills.append(skill)
-                seen.add(skill.lower())
-
-        return unique_skills
-
-    def extract_experience(self, text):
+        # One pass over the text; aliases (e.g. "k8s") map to their canonical name
+        return self.skill_matcher.find(text)
+
+    def extract_experience(self, text, sections=None):
         """Extract work experience entries"""
+        sections = sections or SegmentedText(text)
+        if sections.has('experience'):
+            candidates = sections.lines_of('experience')
+        else:
+            # No experience heading: look at the 10 lines after each line
+            # mentioning experience, in the same single pass
+            candidates = []
+            window = 0
+            for line in sections.lines:
+                if window:
+                    candidates.append(line)
+                    window -= 1
+                line_lower = line.lower()
+                if any(word in line_lower for word in EXPERIENCE_INDICATORS):
+                    window = 10
+
         experiences = []
+        for line in candidates:
+            exp_line = line.strip()
+            if len(exp_line) > 10 and JOB_PATTERN.search(exp_line):
+                experiences.append(exp_line)
+                if len(experiences) == 5:  # Return top 5 experiences
+                    break
+        return experiences
+
+    def extract_education(self, text, sections=None):
+        """Extract education entries from the education section (or the whole text if there is none)"""
+        sections = sections or SegmentedText(text)
+        lines = sections.lines_of('education') if sections.has('education') else sections.lines
 
-        # Patterns for common job titles and companies
-        job_patterns = [
-            r'(Senior|Junior|Lead|Staff)?\s*(Developer|Engineer|Manager|Designer|Analyst|Scientist|Consultant|Architect)',
-            r'(Software|Data|Systems|Network|Database|Frontend|Backend|Full Stack|DevOps)',
-        ]
-
-        # Try to find experience sections
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            # Look for experience indicators
-            if any(word in line_lower for word in ['experience', 'employment', 'work history', 'professional']):
-                # Extract next 10 lines as potential experience entries
-                for j in range(i+1, min(i+11, len(lines))):
-                    exp_line = lines[j].strip()
-                    if len(exp_line) > 10 and any(re.search(pattern, exp_line, re.IGNORECASE) for pattern in job_patterns):
-                        experiences.append(exp_line)
-
-        return experiences[:5]  # Return top 5 experiences
-
-    def extract_education(self, text):
-        """Extract education entries"""
         education = []
-
-        degrees = [
-            'bachelor', 'master', 'phd', 'doctorate', 'mba', 'bs', 'ba', 'ms', 'ma',
-            'b.tech', 'm.tech', 'b.e', 'm.e', 'bsc', 'msc', 'associate', 'diploma'
-        ]
-
-        lines = text.split('\n')
         for line in lines:
-            line_lower = line.lower()
-            if any(degree in line_lower for degree in degrees):
+            if DEGREE_PATTERN.search(line.lower()):
                 education.append(line.strip())
+                if len(education) == 3:  # Return top 3 education entries
+                    break
+        return education
 
-        return education[:3]  # Return top 3 education entries
-
-    def calculate_years_of_experience(self, text):
+    def calculate_years_of_experience(self, text, sections=None):
         """Estimate years of experience from text"""
-        # Look for patterns like "5 years", "3+ years", etc.
-        patterns = [
-            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-            r'experience:\s*(\d+)\+?\s*years?',
-            r'(\d+)\+?\s*years?\s+(?:in|as|with)',
-        ]
-
+        # Look for patterns like "5 years", "3+ years", etc. anywhere (they are usually in the summary)
         max_years = 0
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                years = int(match)
-                if years > max_years and years < 50:  # Sanity check
-                    max_years = years
-
-        # If no explicit mention, try to count date ranges
+        for match in YEARS_PATTERN.finditer(text):
+            years = int(next(group for group in match.groups() if group))
+            if years > max_years and years < 50:  # Sanity check
+                max_years = years
+
+        # If no explicit mention, try to count date ranges in the experience section
         if max_years == 0:
             # Look for date ranges like "2018-2023" or "Jan 2020 - Present"
-            date_ranges = re.findall(r'(20\d{2})\s*[-–]\s*(?:(20\d{2})|present|current)', text, re.IGNORECASE)
+            sections = sections or SegmentedText(text)
+            scope = sections.text_of('experience') if sections.has('experience') else text
+            date_ranges = DATE_RANGE_PATTERN.findall(scope)
             if date_ranges:
                 total_years = 0
                 current_year = 2026  # Update this
@@ -188,6 +420,38 @@ class ResumeParser:
 
         return max_years
 
+    def ner_text(self, result):
+        """Text sent to NER: the contact, experience and education sections (or all text), capped"""
+        lines = result['raw_text'].split('\n')
+        parts = ['\n'.join(lines[section['start']:section['end']]) for section in result.get('sections', [])
+                 if section['kind'] in ('contact', 'experience', 'education')]
+        text = '\n'.join(parts) or result['raw_text']
+        return text[:NER_MAX_CHARS] if NER_MAX_CHARS else text
+
+    def extract_named_entities(self, doc):
+        """People, organizations and dates from a spaCy Doc, deduplicated in document order"""
+        entities = {key: [] for key in NER_LABELS.values()}
+        for ent in doc.ents:
+            key = NER_LABELS.get(ent.label_)
+            value = ' '.join(ent.text.split())
+            if key and value and value not in entities[key] and len(entities[key]) < NER_MAX_ENTITIES:
+                entities[key].append(value)
+        return entities
+
+    def add_named_entities(self, results):
+        """
+        Add names, organizations and dates to parse results, running the
+        documents through spaCy in nlp.pipe() batches
+        """
+        nlp = self.nlp
+        if nlp is None:
+            for result in results:
+                result['entities'].update({key: [] for key in NER_LABELS.values()})
+            return
+        docs = nlp.pipe((self.ner_text(result) for result in results), batch_size=NER_BATCH_SIZE)
+        for result, doc in zip(results, docs):
+            result['entities'].update(self.extract_named_entities(doc))
+
     def clean_text(self, text):
         """Clean and normalize text"""
         # Remove extra whitespace
@@ -196,13 +460,15 @@ class ResumeParser:
         text = re.sub(r'[^\w\s@.+\-(),]', '', text)
         return text.strip()
 
-    def parse_resume(self, file_path, file_type):
+    def parse_resume(self, file_path, file_type, named_entities=True):
         """
         Main function to parse a resume
 
         Args:
             file_path: Path to the resume file
             file_type: Type of file (pdf or docx)
+            named_entities: Run spaCy NER for names, organizations and dates
+                (parse_resumes_batch() turns this off and runs NER for the whole batch)
 
         Returns:
             Dictionary containing parsed data
@@ -210,9 +476,9 @@ class ResumeParser:
         try:
             # Extract text based on file type
             if file_type.lower() == 'pdf':
-                raw_text = self.extract_text_from_pdf(file_path)
+                raw_text, truncated = self.extract_text_from_pdf(file_path)
             elif file_type.lower() in ['docx', 'doc']:
-                raw_text = self.extract_text_from_docx(file_path)
+                raw_text, truncated = self.extract_text_from_docx(file_path)
             else:
                 raise ValueError(f"Unsupported file type: {file_type}")
 
@@ -222,18 +488,23 @@ class ResumeParser:
             # Clean text
             cleaned_text = self.clean_text(raw_text)
 
+            # Split into sections once; each extractor reads only its own
+            sections = SegmentedText(raw_text)
+
             # Extract entities
-            email = self.extract_email(raw_text)
-            phone = self.extract_phone(raw_text)
+            email = self.extract_email(raw_text, sections)
+            phone = self.extract_phone(raw_text, sections)
             skills = self.extract_skills(raw_text)
-            experience = self.extract_experience(raw_text)
-            education = self.extract_education(raw_text)
-            years_of_experience = self.calculate_years_of_experience(raw_text)
+            experience = self.extract_experience(raw_text, sections)
+            education = self.extract_education(raw_text, sections)
+            years_of_experience = self.calculate_years_of_experience(raw_text, sections)
 
             # Build result
             result = {
                 'raw_text': raw_text,
                 'cleaned_text': cleaned_text,
+                'truncated': truncated,
+                'sections': sections.to_list(),
                 'entities': {
                     'email': email,
                     'phone': phone,
@@ -244,12 +515,34 @@ class ResumeParser:
                 }
             }
 
+            if named_entities:
+                self.add_named_entities([result])
+
             return result
 
         except Exception as e:
             print(f"Error parsing resume: {str(e)}")
             raise
 
+    def parse_resumes_batch(self, files):
+        """
+        Parse many resumes, sharing one nlp.pipe() pass for named entities
+
+        Args:
+            files: List of (file_path, file_type)
+
+        Returns:
+            List of (parsed data or None, error message or None), in input order
+        """
+        results = []
+        for file_path, file_type in files:
+            try:
+                results.append((self.parse_resume(file_path, file_type, named_entities=False), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        self.add_named_entities([result for result, _ in results if result is not None])
+        return results
+
 
 # Global parser instance
 resume_parser = ResumeParser()
@@ -0,0 +1,82 @@
+"""
+Section Segmenter Service
+Splits resume text into typed sections in one pass over its lines
+"""
+
+import re
+from collections import namedtuple
+
+# A run of lines [start, end) under one heading; the heading line itself is not included
+Section = namedtuple('Section', ['kind', 'heading', 'start', 'end'])
+
+# Heading keywords per section kind, checked in this order ("Experience Summary" is experience)
+HEADING_KEYWORDS = [
+    ('experience', ['experience', 'employment', 'employer', 'work history', 'career history']),
+    ('education', ['education', 'educational', 'academic', 'academics', 'qualification', 'qualifications']),
+    ('skills', ['skills', 'skill set', 'skillset', 'competencies', 'technologies', 'technical expertise']),
+    ('contact', ['contact', 'personal details', 'personal information']),
+    ('other', ['summary', 'objective', 'profile', 'projects', 'certifications', 'certification', 'achievements',
+               'accomplishments', 'awards', 'languages', 'interests', 'hobbies', 'declaration', 'references',
+               'publications', 'training']),
+]
+HEADING_PATTERNS = [
+    (kind, re.compile(r'\b(?:' + '|'.join(re.escape(keyword) for keyword in keywords) + r')\b'))
+    for kind, keywords in HEADING_KEYWORDS
+]
+MAX_HEADING_WORDS = 4
+MAX_HEADING_LENGTH = 50
+
+
+def classify_heading(line):
+    """Section kind if the line looks like a section heading, else None"""
+    line = line.strip()
+    if not line or len(line) > MAX_HEADING_LENGTH or '@' in line or any(c.isdigit() for c in line):
+        return None
+    words = re.findall(r'[a-z]+', line.lower())
+    if not words or len(words) > MAX_HEADING_WORDS:
+        return None
+    heading = ' '.join(words)
+    for kind, pattern in HEADING_PATTERNS:
+        if pattern.search(heading):
+            return kind
+    return None
+
+
+class SegmentedText:
+    """
+    Resume text split into typed sections
+
+    Lines before the first heading form the 'contact' section (name, email,
+    phone). Every later heading starts a new section that runs to the next
+    heading; a kind can occur more than once.
+    """
+
+    def __init__(self, text):
+        self.lines = text.split('\n')
+        self.sections = []
+
+        kind, heading, start = 'contact', None, 0
+        for i, line in enumerate(self.lines):
+            next_kind = classify_heading(line)
+            if next_kind is None:
+                continue
+            if i > start:
+                self.sections.append(Section(kind, heading, start, i))
+            kind, heading, start = next_kind, line.strip(), i + 1
+        if len(self.lines) > start:
+            self.sections.append(Section(kind, heading, start, len(self.lines)))
+
+    def has(self, kind):
+        return any(section.kind == kind for section in self.sections)
+
+    def lines_of(self, kind):
+        """Lines of all sections of one kind, in document order"""
+        return [line for section in self.sections if section.kind == kind
+                for line in self.lines[section.start:section.end]]
+
+    def text_of(self, kind):
+        return '\n'.join(self.lines_of(kind))
+
+    def to_list(self):
+        """Sections as JSON-serializable dicts"""
+        return [section._asdict() for section in self.sections]
@@ -0,0 +1,80 @@
+"""
+Skill Matcher Service
+Matches resume text against the skills taxonomy in one pass
+"""
+
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'skills.json')
+
+# Words and the symbols that occur inside skill names (c++, c#, node.js, ci/cd, objective-c)
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[+#./\-]')
+
+
+def tokenize(text):
+    """Split lowercased text into word and symbol tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SkillMatcher:
+    """
+    Dictionary of skill phrases compiled into token-tuple lookups
+
+    Every canonical name and alias is tokenized the same way as the resume
+    text. Matching walks the text once and, at each token, looks up the
+    phrases starting there; a prefix set stops the walk as soon as no longer
+    phrase can match. The cost depends on the text length and the longest
+    phrase, not on the number of skills.
+    """
+
+    def __init__(self, skills):
+        """
+        Args:
+            skills: List of {'name': ..., 'aliases': [...]} entries, in display order
+        """
+        self.names = []
+        self.phrases = {}
+        self.prefixes = set()
+        self.max_len = 0
+
+        for entry in skills:
+            name = entry['name']
+            if name in self.names:
+                continue
+            index = len(self.names)
+            self.names.append(name)
+            for phrase in [name] + list(entry.get('aliases', [])):
+                key = tuple(tokenize(phrase))
+                if not key or key in self.phrases:
+                    continue
+                self.phrases[key] = index
+                self.max_len = max(self.max_len, len(key))
+                for i in range(1, len(key)):
+                    self.prefixes.add(key[:i])
+
+    @classmethod
+    def from_file(cls, path=None):
+        """Load a taxonomy JSON file ({"skills": [...]})"""
+        path = path or DEFAULT_TAXONOMY_PATH
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['skills'])
+
+    def find(self, text):
+        """Canonical names of the skills mentioned in text, in taxonomy order"""
+        tokens = tokenize(text)
+        found = set()
+        for i in range(len(tokens)):
+            for j in range(i + 1, min(i + self.max_len, len(tokens)) + 1):
+                key = tuple(tokens[i:j])
+                index = self.phrases.get(key)
+                if index is not None:
+                    found.add(index)
+                if key not in self.prefixes:
+                    break
+        return [self.names[index] for index in sorted(found)]
+
+    def __len__(self):
+        return len(self.names)
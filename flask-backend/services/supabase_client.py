@@ -31,6 +31,15 @@ class SupabaseService:
             print(f"Error inserting resume: {str(e)}")
             raise
 
+    def insert_resumes(self, resumes_data):
+        """Insert many resumes with a single request"""
+        try:
+            response = self.client.table('resumes').insert(resumes_data).execute()
+            return response.data if response.data else []
+        except Exception as e:
+            print(f"Error inserting resumes: {str(e)}")
+            raise
+
     def update_resume(self, resume_id, update_data):
         """Update an existing resume"""
         try: